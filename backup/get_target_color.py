@@ -1,12 +1,15 @@
 from OT2Demo.src.OT2wrapper import OpenTrons
 from prefect import flow,task,serve
-from LabMind import KnowledgeObject,nosql_service
-from LabMind.Utils import upload
+from LabMind import nosql_service
+from pymongo import InsertOne
 
 color_metadata = {"R": 0.1, "G": 0.6, "B": 0.3, "mae": 0.25}
 
 session_id="test"
 
+# 96-well names in row-major order, built once instead of per loop iteration
+_WELLS = tuple(f"{r}{c}" for r in "ABCDEFGH" for c in range(1, 13))
+
 @flow(log_prints=True)
 def setup_target(R,G,B,mix_well="H11"):
     # check if they add up to 1
@@ -17,7 +20,6 @@ def setup_target(R,G,B,mix_well="H11"):
     ot2.home()
 
     position = ["B1", "B2", "B3"]
-    rows = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
     portion = {"B1": R, "B2": G, "B3": B}
     total_volume = 150
     red_volume = int(portion["B1"] * total_volume)
@@ -25,10 +27,10 @@ def setup_target(R,G,B,mix_well="H11"):
     blue_volume = int(portion["B3"] * total_volume)
     reservoir = {"B1": red_volume, "B2": green_volume, "B3": blue_volume}
 
-    columns = [str(i) for i in range(1, 13)]
+    # target records are written in one bulk_write after the loop instead of one upload per well
+    pending = []
     for i in range(5,6):
-        row = rows[i // 12]
-        col = columns[i % 12]
+        current_well = _WELLS[i]
         for pos in position:
             if float(portion[pos]) != 0.0:
                 ot2.p_300_pick_up_tip(pos,tiptrack="tiprack_1")
@@ -55,10 +57,12 @@ def setup_target(R,G,B,mix_well="H11"):
                     "unique_fields": unique_fields,
                     "session_id": session_id}
         
-        target = KnowledgeObject(metadata=metadata,nosql_service=nosql_service,embedding=False)
-        upload(target)
+        pending.append(metadata)
         print(well_color_data)
 
+    if pending:
+        nosql_service["OT2"]["target"].bulk_write([InsertOne(m) for m in pending], ordered=False)
+
     print("Protocol execution complete")
     ot2.close_session()
     print("Session closed")
@@ -1,10 +1,13 @@
-from fastapi import FastAPI, WebSocket, Request
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from motor.motor_asyncio import AsyncIOMotorClient
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from io import BytesIO
+import numpy as np
 import asyncio
 import os
+import threading
 
 app = FastAPI()
 
@@ -15,18 +18,19 @@ db = client['demo_db']
 collection = db['numbers']
 target_collection = db['target_rgb']
 
-# Create 'static' folder if it doesn't exist
-os.makedirs("static", exist_ok=True)
-
 # Define initial target RGB channel
-target_rgb = [0.4, 0.3, 0.3]  # Example target RGB ratios
-plot_file = 'static/plot.png'  # Define plot file path
+# kept as an ndarray so each MNE calculation doesn't convert it again
+target_rgb = np.array([0.4, 0.3, 0.3])  # Example target RGB ratios
+# Latest rendered plot, served from memory instead of a file
+_png_bytes = b""
+# Set (and replaced) whenever a new plot is rendered, so /ws clients only get a frame when there is one
+_plot_updated = asyncio.Event()
 
 # List to store MNE history
 mne_history = []
 
 # Global variable for current RGB ratios
-current_rgb_ratio = [0.33, 0.33, 0.34]  # Initial RGB ratios
+current_rgb_ratio = np.array([0.33, 0.33, 0.34])  # Initial RGB ratios
 num_iterations_to_run = 0  # Number of additional iterations specified by the user
 
 async def load_data_from_mongodb():
@@ -43,7 +47,7 @@ async def load_target_from_db():
     global target_rgb
     target = await target_collection.find_one({}, sort=[('_id', -1)])
     if target:
-        target_rgb = [target['R'], target['G'], target['B']]
+        target_rgb = np.array([target['R'], target['G'], target['B']], dtype=np.float64)
 
 async def save_target_to_db(new_target):
     """
@@ -55,12 +59,69 @@ def calculate_mne(current_rgb, target_rgb):
     """
     Calculate Mean Normalized Error (MNE) for each RGB channel.
     """
-    return np.abs((np.array(current_rgb) - np.array(target_rgb)) / np.array(target_rgb))
+    return np.abs(np.subtract(current_rgb, target_rgb) / target_rgb)
+
+def _build_figure():
+    """
+    Build the figure and its artists once; each refresh only updates their data.
+    """
+    channels = ['R', 'G', 'B']
+    # Figure instead of pyplot: pyplot's global state is not safe to use off the main thread
+    fig = Figure(figsize=(12, 5))
+    ax_mne, ax_rgb = fig.subplots(1, 2)
+
+    # Create MNE over iterations plot
+    line, = ax_mne.plot([], [], marker='o', color='blue')
+    ax_mne.set_title("Mean Normalized Error (MNE) over Iterations")
+    ax_mne.set_xlabel("Iteration")
+    ax_mne.set_ylabel("Average MNE")
+    ax_mne.set_ylim(0, 1)  # Limit y-axis for better visualization
+
+    # Create RGB bar chart
+    width = 0.35
+    x = np.arange(len(channels))
+
+    # Plot current RGB values
+    bars_current = ax_rgb.bar(x - width/2, [0, 0, 0], width=width, label='Current RGB', color='cyan')
+    # Plot target RGB values
+    bars_target = ax_rgb.bar(x + width/2, [0, 0, 0], width=width, label='Target RGB', color='magenta')
+
+    ax_rgb.set_xticks(x, channels)
+    ax_rgb.set_title("Current vs. Target RGB Ratios")
+    ax_rgb.set_xlabel("Channel")
+    ax_rgb.set_ylabel("Ratio")
+    ax_rgb.legend(loc="upper right")
+
+    fig.tight_layout()
+    return fig, ax_mne, ax_rgb, line, bars_current, bars_target
+
+_fig, _ax_mne, _ax_rgb, _mne_line, _bars_current, _bars_target = _build_figure()
+# renders run on executor threads and share the one figure
+_render_lock = threading.Lock()
+
+def _render_plots(mne_history, current_rgb, target_rgb):
+    """
+    Render the MNE history and RGB bar chart to PNG bytes (blocking, runs in a worker thread).
+    """
+    with _render_lock:
+        _mne_line.set_data(range(1, len(mne_history) + 1), mne_history)
+        _ax_mne.relim()
+        _ax_mne.autoscale_view(scaley=False)
+        for bar, height in zip(_bars_current, current_rgb):
+            bar.set_height(height)
+        for bar, height in zip(_bars_target, target_rgb):
+            bar.set_height(height)
+        _ax_rgb.relim()
+        _ax_rgb.autoscale_view()
+        buf = BytesIO()
+        _fig.savefig(buf, format='png')
+    return buf.getvalue()
 
 async def create_plots(current_rgb, iteration):
     """
     Create two plots: MNE over iterations and RGB bar chart.
     """
+    global _png_bytes, _plot_updated
     # Load data from MongoDB for plotting
     data = await load_data_from_mongodb()
 
@@ -70,38 +131,14 @@ async def create_plots(current_rgb, iteration):
 
     # Ensure mne_history and iteration have matching lengths
     mne_history.append(avg_mne)
-    x_iterations = list(range(1, len(mne_history) + 1))
-
-    channels = ['R', 'G', 'B']
-    
-    # Create MNE over iterations plot
-    plt.figure(figsize=(12, 5))
-    plt.subplot(1, 2, 1)
-    plt.plot(x_iterations, mne_history, marker='o', color='blue')
-    plt.title("Mean Normalized Error (MNE) over Iterations")
-    plt.xlabel("Iteration")
-    plt.ylabel("Average MNE")
-    plt.ylim(0, 1)  # Limit y-axis for better visualization
-
-    # Create RGB bar chart
-    plt.subplot(1, 2, 2)
-    width = 0.35
-    x = np.arange(len(channels))
 
-    # Plot current RGB values
-    plt.bar(x - width/2, current_rgb, width=width, label='Current RGB', color='cyan')
-    # Plot target RGB values
-    plt.bar(x + width/2, target_rgb, width=width, label='Target RGB', color='magenta')
-
-    plt.xticks(x, channels)
-    plt.title("Current vs. Target RGB Ratios")
-    plt.xlabel("Channel")
-    plt.ylabel("Ratio")
-    plt.legend(loc="upper right")
-    
-    plt.tight_layout()
-    plt.savefig(plot_file)
-    plt.close()
+    # Rendering takes ~100ms; keep it off the event loop so other requests keep flowing
+    # (the RGB arrays are rebound, never mutated, so they are handed over without copying)
+    _png_bytes = await asyncio.get_running_loop().run_in_executor(
+        None, _render_plots, list(mne_history), current_rgb, target_rgb
+    )
+    _plot_updated.set()
+    _plot_updated = asyncio.Event()
 
 @app.get("/", response_class=HTMLResponse)
 async def get():
@@ -162,9 +199,14 @@ async def get():
                 }
             }
 
-            setInterval(function() {
-                document.getElementById("plot").src = '/static/plot.png?' + new Date().getTime();
-            }, 1000);
+            // the server pushes each new plot, so nothing is fetched while no iteration runs
+            const ws = new WebSocket(`ws://${location.host}/ws`);
+            ws.binaryType = 'blob';
+            ws.onmessage = function(event) {
+                const plot = document.getElementById("plot");
+                if (plot.src.startsWith('blob:')) URL.revokeObjectURL(plot.src);
+                plot.src = URL.createObjectURL(event.data);
+            };
         </script>
     </head>
     <body>
@@ -201,7 +243,7 @@ async def update_rgb(request: Request):
     """
     global current_rgb_ratio
     data = await request.json()
-    current_rgb_ratio = [data['R'], data['G'], data['B']]
+    current_rgb_ratio = np.array([data['R'], data['G'], data['B']], dtype=np.float64)
     return JSONResponse({"status": "success"})
 
 @app.post("/set_target")
@@ -211,7 +253,7 @@ async def set_target(request: Request):
     """
     global target_rgb
     data = await request.json()
-    target_rgb = [data['R'], data['G'], data['B']]
+    target_rgb = np.array([data['R'], data['G'], data['B']], dtype=np.float64)
     await save_target_to_db({"R": data['R'], "G": data['G'], "B": data['B']})
     return JSONResponse({"status": "target set successfully"})
 
@@ -228,11 +270,26 @@ async def set_iterations(request: Request):
 @app.get("/static/plot.png")
 async def get_plot():
     """
-    Serve the plot file, ensuring it exists.
+    Serve the latest plot, rendering an initial one if none exists yet.
     """
-    if not os.path.exists(plot_file):
+    if not _png_bytes:
         await create_plots([0, 0, 0], 0)  # Create initial plot if it doesn't exist
-    return FileResponse(plot_file)
+    return Response(content=_png_bytes, media_type="image/png")
+
+@app.websocket("/ws")
+async def plot_updates(websocket: WebSocket):
+    """
+    Push the current plot, then every new one as it is rendered.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            # take the event before sending, so a plot rendered during the send is not missed
+            updated = _plot_updated
+            await websocket.send_bytes(_png_bytes)
+            await updated.wait()
+    except WebSocketDisconnect:
+        pass
 
 async def update_plots_periodically():
     """
@@ -1,10 +1,7 @@
 from fastapi import FastAPI, WebSocket
 from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles  # Import StaticFiles
 from motor.motor_asyncio import AsyncIOMotorClient
-import matplotlib.pyplot as plt
 import asyncio
-import os
 import uvicorn  # Import uvicorn to run the server
 
 app = FastAPI()
@@ -12,21 +9,10 @@ client = AsyncIOMotorClient("mongodb://localhost:27017")
 db = client['demo_db']
 collection = db['numbers']
 
-# Create 'static' folder if it doesn't exist
-os.makedirs("static", exist_ok=True)
-
-# Mount the 'static' directory to serve static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-async def create_plot():
-    data = await collection.find().to_list(100)
-    x = [i for i, _ in enumerate(data)]
-    y = [item['number'] for item in data]
-
-    plt.figure()
-    plt.plot(x, y, marker='o')
-    plt.savefig('static/plot.png')
-    plt.close()
+async def get_plot_data():
+    # The browser draws the chart, so each tick only ships the raw points
+    y = [item['number'] async for item in collection.find(projection={'number': 1, '_id': 0}).limit(100)]
+    return {'x': list(range(len(y))), 'y': y}
 
 @app.get("/", response_class=HTMLResponse)
 async def get():
@@ -35,11 +21,31 @@ async def get():
     <head><title>Dynamic Plot</title></head>
     <body>
         <h1>Real-time Data Plot</h1>
-        <img id="plot" src="/static/plot.png" alt="Plot">
+        <canvas id="plot" width="640" height="480"></canvas>
         <script>
+            const canvas = document.getElementById("plot");
+            const ctx = canvas.getContext("2d");
+            function draw(data) {
+                ctx.clearRect(0, 0, canvas.width, canvas.height);
+                if (data.y.length === 0) return;
+                const pad = 30;
+                const xMax = Math.max(data.x.length - 1, 1);
+                const yMin = Math.min(...data.y), yMax = Math.max(...data.y);
+                const ySpan = (yMax - yMin) || 1;
+                const px = x => pad + x / xMax * (canvas.width - 2 * pad);
+                const py = y => canvas.height - pad - (y - yMin) / ySpan * (canvas.height - 2 * pad);
+                ctx.beginPath();
+                data.x.forEach((x, i) => i ? ctx.lineTo(px(x), py(data.y[i])) : ctx.moveTo(px(x), py(data.y[i])));
+                ctx.stroke();
+                data.x.forEach((x, i) => {
+                    ctx.beginPath();
+                    ctx.arc(px(x), py(data.y[i]), 3, 0, 2 * Math.PI);
+                    ctx.fill();
+                });
+            }
             let ws = new WebSocket("ws://localhost:8000/ws");
             ws.onmessage = function(event) {
-                document.getElementById("plot").src = '/static/plot.png?' + new Date().getTime();
+                draw(JSON.parse(event.data));
             };
         </script>
     </body>
@@ -50,8 +56,7 @@ async def get():
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     while True:
-        await create_plot()  # Update plot on each WebSocket message
-        await websocket.send_text("updated")
+        await websocket.send_json(await get_plot_data())
         await asyncio.sleep(1)  # Send an update every 1 seconds
 
 if __name__ == "__main__":
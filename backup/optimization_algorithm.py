@@ -1,12 +1,68 @@
-import pandas as pd
 from ax.service.ax_client import AxClient, ObjectiveProperties
-from sklearn.metrics import mean_absolute_error
+
+class Optimizer:
+    """
+    Bayesian optimizer for R, G, B proportions that keeps one AxClient for a
+    whole session, so each new result is attached once instead of replaying
+    every past trial on every suggestion.
+
+    Parameters
+    ----------
+    total : float, optional
+        The sum constraint for R, G, and B. Defaults to 1.0.
+    random_seed : int, optional
+        Random seed for reproducibility. Defaults to 42.
+    """
+
+    def __init__(self, total=1.0, random_seed=42):
+        self.total = total
+        # number of results attached so far, so callers can pass only the new ones
+        self.n_observed = 0
+
+        # Initialize AxClient
+        self.ax_client = AxClient(random_seed=random_seed)
+
+        # Define experiment parameters
+        parameters = [
+            {"name": "R", "type": "range", "bounds": [0.0, total], "value_type": "float"},
+            {"name": "G", "type": "range", "bounds": [0.0, total], "value_type": "float"},
+        ]
+
+        # Define objective to minimize MAE
+        objectives = {"mae": ObjectiveProperties(minimize=True)}
+
+        # Create the experiment
+        self.ax_client.create_experiment(
+            parameters=parameters,
+            objectives=objectives,
+            parameter_constraints=[f"R + G <= {total}"]
+        )
+
+    def observe(self, experiment):
+        """
+        Attach one finished experiment, a dict with keys 'R', 'G', 'B', and 'mae'.
+        """
+        _, trial_index = self.ax_client.attach_trial(parameters={"R": experiment["R"], "G": experiment["G"]})
+        self.ax_client.complete_trial(trial_index=trial_index, raw_data={"mae": experiment["mae"]})
+        self.n_observed += 1
+
+    def suggest(self):
+        """
+        Return the next set of optimal parameters for R, G, B.
+        """
+        parameterization, trial_index = self.ax_client.get_next_trial()
+        # the result comes back through observe(), so the suggested trial must not stay pending
+        self.ax_client.abandon_trial(trial_index=trial_index)
+        parameterization["B"] = self.total - parameterization["R"] - parameterization["G"]
+        return parameterization
+
 
 # Define the optimize function
 def optimize(past_experiments, total=1.0, random_seed=42):
     """
     Takes a list of past experiments and outputs the next R, G, B parameters
-    using Bayesian optimization.
+    using Bayesian optimization. Builds a fresh Optimizer; keep an Optimizer
+    instead when suggesting repeatedly within one session.
 
     Parameters
     ----------
@@ -22,40 +78,20 @@ def optimize(past_experiments, total=1.0, random_seed=42):
     dict
         Next set of optimal parameters for R, G, B.
     """
-    # Initialize AxClient
-    ax_client = AxClient(random_seed=random_seed)
-    
-    # Define experiment parameters
-    parameters = [
-        {"name": "R", "type": "range", "bounds": [0.0, total], "value_type": "float"},
-        {"name": "G", "type": "range", "bounds": [0.0, total], "value_type": "float"},
-    ]
-    
-    # Define objective to minimize MAE
-    objectives = {"mae": ObjectiveProperties(minimize=True)}
-    
-    # Create the experiment
-    ax_client.create_experiment(
-        parameters=parameters, 
-        objectives=objectives, 
-        parameter_constraints=[f"R + G <= {total}"]
-    )
-    
+    optimizer = Optimizer(total=total, random_seed=random_seed)
+
     # Load past experiments into AxClient
     for experiment in past_experiments:
-        trial_parameters = {"R": experiment["R"], "G": experiment["G"]}
-        ax_client.attach_trial(parameters=trial_parameters)
-        ax_client.complete_trial(trial_index=len(ax_client.experiment.trials) - 1, 
-                                 raw_data={"mae": experiment["mae"]})
-    
+        optimizer.observe(experiment)
+
     # Get the next trial suggestion
-    parameterization, _ = ax_client.get_next_trial()
-    parameterization["B"] = total - parameterization["R"] - parameterization["G"]
-    
-    return parameterization
+    return optimizer.suggest()
 
 # Simulated case study
 if __name__ == "__main__":
+    # only the simulation needs sklearn, so importing this module stays cheap
+    from sklearn.metrics import mean_absolute_error
+
     # Define a list of past experiments with simulated results
     past_experiments = [
         {"R": 0.1, "G": 0.6, "B": 0.3, "mae": 0.25},
@@ -1,12 +1,18 @@
 from OT2Demo.src.OT2wrapper import OpenTrons
 from prefect import flow,task,serve
-from LabMind import KnowledgeObject,nosql_service
-from LabMind.Utils import upload
-from optimization_algorithm import optimize
+from LabMind import nosql_service
+from pymongo import InsertOne
+from optimization_algorithm import Optimizer
 import pandas as pd
 
 session_id="test"
 
+# one optimizer per session, kept across flow runs so only new experiments are attached
+_optimizers = {}
+
+# 96-well names in row-major order, built once instead of per loop iteration
+_WELLS = tuple(f"{r}{c}" for r in "ABCDEFGH" for c in range(1, 13))
+
 def extract_previous_experiments(session_id):
     db="OT2"
     collection = "experiments"
@@ -39,7 +45,13 @@ def optimization_workflow():
     # find parameters
     past_experiments = extract_previous_experiments(session_id)
     # optimize
-    next_parameters = optimize(past_experiments)
+    if session_id not in _optimizers:
+        _optimizers[session_id] = Optimizer()
+    optimizer = _optimizers[session_id]
+    # experiments come back in insertion order, so the ones not yet attached are the tail
+    for experiment in past_experiments[optimizer.n_observed:]:
+        optimizer.observe(experiment)
+    next_parameters = optimizer.suggest()
     # find empty wells
     empty_well = find_unused_wells()[0]
     
@@ -56,7 +68,6 @@ def setup_target(R,G,B,mix_well="H11"):
     ot2.home()
 
     position = ["B1", "B2", "B3"]
-    rows = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
     portion = {"B1": R, "B2": G, "B3": B}
     total_volume = 150
     red_volume = int(portion["B1"] * total_volume)
@@ -64,10 +75,10 @@ def setup_target(R,G,B,mix_well="H11"):
     blue_volume = int(portion["B3"] * total_volume)
     reservoir = {"B1": red_volume, "B2": green_volume, "B3": blue_volume}
 
-    columns = [str(i) for i in range(1, 13)]
+    # target records are written in one bulk_write after the loop instead of one upload per well
+    pending = []
     for i in range(5,6):
-        row = rows[i // 12]
-        col = columns[i % 12]
+        current_well = _WELLS[i]
         for pos in position:
             if float(portion[pos]) != 0.0:
                 ot2.p_300_pick_up_tip(pos,tiptrack="tiprack_1")
@@ -92,11 +103,12 @@ def setup_target(R,G,B,mix_well="H11"):
                     "project": project,
                     "collection": collection,
                     "unique_fields": unique_fields}
-        
-        target = KnowledgeObject(metadata=metadata,nosql_service=nosql_service,embedding=False)
-        upload(target)
+        pending.append(metadata)
         print(well_color_data)
 
+    if pending:
+        nosql_service["OT2"]["target"].bulk_write([InsertOne(m) for m in pending], ordered=False)
+
     print("Protocol execution complete")
     ot2.close_session()
     print("Session closed")
\ No newline at end of file
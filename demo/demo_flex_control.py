@@ -1,8 +1,10 @@
 import sys
+from importlib.util import find_spec
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Fall back to the checkout's src/ only when the package isn't installed (pip install -e .)
+if find_spec("opentrons_workflows") is None:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from opentrons_workflows import OpentronsControl
 import time
@@ -1,11 +1,12 @@
 import sys
+from importlib.util import find_spec
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Fall back to the checkout's src/ only when the package isn't installed (pip install -e .)
+if find_spec("opentrons_workflows") is None:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from opentrons_workflows import OpentronsControl
-import json
 import time
 
 
@@ -18,12 +19,10 @@ def demo_ot2(simulation: bool = True):
     ot.home()
 
     # Example usage with custom labware (commented out for basic demo)
-    # with open(Path(r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json"), "r") as f:
-    #     plate_1 = json.load(f)
-    # with open(Path(r"C:\Users\aag\Downloads\matterlab_1_beaker_30000ul.json"), "r") as f:
-    #     beaker_1 = json.load(f)
-    # with open(Path(r"C:\Users\aag\Downloads\matterlab_96_tiprack_10ul.json"), "r") as f:
-    #     tips_1 = json.load(f)
+    # from opentrons_workflows import load_labware_def
+    # plate_1 = load_labware_def(r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json")
+    # beaker_1 = load_labware_def(r"C:\Users\aag\Downloads\matterlab_1_beaker_30000ul.json")
+    # tips_1 = load_labware_def(r"C:\Users\aag\Downloads\matterlab_96_tiprack_10ul.json")
 
     # plates = [
     #     {"nickname": "plate_96_1", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True, "config": {}},
@@ -4,18 +4,25 @@ Demonstration of OT-2 REST API and Workflow Orchestrator
 Shows how to integrate OT-2 with other instruments using Prefect
 """
 
+import argparse
 import asyncio
-import requests
+import logging
+import os
+import httpx
+import orjson
 import json
 import time
 from datetime import datetime
 import sys
+from importlib.util import find_spec
 from pathlib import Path
 
-# Add project root to path
-sys.path.append(str(Path(__file__).parent.parent))
+# Fall back to the checkout's src/ only when the package isn't installed (pip install -e .)
+if find_spec("opentrons_workflows") is None:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from src.opentrons_workflows.workflow_orchestrator import (
+from opentrons_workflows._wells import WELLS_96
+from opentrons_workflows.workflow_orchestrator import (
     register_ot2_robot,
     register_instrument,
     sample_preparation_workflow,
@@ -23,145 +30,251 @@ from src.opentrons_workflows.workflow_orchestrator import (
     high_throughput_screening_workflow
 )
 
+logger = logging.getLogger("otdemo")
+
 # REST API Base URL (when running the FastAPI server)
 API_BASE = "http://localhost:8000"
+REQUEST_TIMEOUT = httpx.Timeout(30.0, connect=3.0)  # a dead server fails fast
+REQUEST_LIMITS = httpx.Limits(max_keepalive_connections=8)
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+async def _post_noread(client: httpx.AsyncClient, url: str, **kwargs) -> int:
+    """POST and return only the status code, closing the response without reading its body"""
+    async with client.stream("POST", url, **kwargs) as response:
+        return response.status_code
+
+async def _delete_noread(client: httpx.AsyncClient, url: str, **kwargs) -> int:
+    """DELETE and return only the status code, closing the response without reading its body"""
+    async with client.stream("DELETE", url, **kwargs) as response:
+        return response.status_code
+
+# Last ETag seen per robot, so repeated status checks can be answered with an empty 304
+_status_etags = {}
+
+async def get_robot_status(client: httpx.AsyncClient, robot_id: str):
+    """Return the robot status, or None if it is unavailable or unchanged since the last call"""
+    etag = _status_etags.get(robot_id)
+    headers = {"If-None-Match": etag} if etag else {}
+    response = await client.get(f"/robots/{robot_id}/status", headers=headers)
+    if response.status_code != 200:  # 304 Not Modified or an error
+        return None
+    # servers that don't send an ETag get plain requests; a stale tag from an earlier response is dropped
+    etag = response.headers.get("ETag")
+    if etag:
+        _status_etags[robot_id] = etag
+    else:
+        _status_etags.pop(robot_id, None)
+    return orjson.loads(response.content)
 
-def demo_rest_api_usage():
+async def demo_rest_api_usage():
     """Demonstrate REST API usage"""
-    print("🌐 OT-2 REST API Demo")
-    print("=" * 50)
+    async with httpx.AsyncClient(base_url=API_BASE, timeout=REQUEST_TIMEOUT, limits=REQUEST_LIMITS) as client:
+        logger.info("🌐 OT-2 REST API Demo")
+        logger.info("=" * 50)
     
-    # Note: This requires the FastAPI server to be running
-    # Start with: python src/opentrons_workflows/ot2_rest_api.py
+        # Note: This requires the FastAPI server to be running
+        # Start with: python src/opentrons_workflows/ot2_rest_api.py
     
-    try:
-        # Health check
-        response = requests.get(f"{API_BASE}/health")
+        try:
+            # Health check
+            response = await client.get("/health")
+            if response.status_code == 200:
+                logger.info("✅ API server is running")
+                if logger.isEnabledFor(logging.INFO):  # skip the JSON parse when nobody will see it
+                    logger.info("   Status: %s", orjson.loads(response.content))
+            else:
+                logger.error("❌ API server not accessible")
+                return
+        except httpx.ConnectError:
+            logger.error("❌ API server not running. Start with:")
+            logger.error("   python src/opentrons_workflows/ot2_rest_api.py")
+            return
+    
+        # Connect to robot
+        logger.info("\n🔌 Connecting to OT-2...")
+        connect_data = {
+            "robot_id": "ot2_demo",
+            "host_alias": "ot2_tailscale",
+            "password": "accelerate",
+            "max_retries": 3,
+            "command_timeout": 30
+        }
+    
+        response = await client.post("/robots/ot2_demo/connect", content=orjson.dumps(connect_data), headers=JSON_HEADERS)
         if response.status_code == 200:
-            print("✅ API server is running")
-            print(f"   Status: {response.json()}")
+            logger.info("✅ Robot connected successfully")
+            if logger.isEnabledFor(logging.INFO):  # skip the JSON parse when nobody will see it
+                logger.info("   Response: %s", orjson.loads(response.content))
         else:
-            print("❌ API server not accessible")
+            logger.error("❌ Connection failed: %s", response.text)
             return
-    except requests.exceptions.ConnectionError:
-        print("❌ API server not running. Start with:")
-        print("   python src/opentrons_workflows/ot2_rest_api.py")
-        return
     
-    # Connect to robot
-    print("\n🔌 Connecting to OT-2...")
-    connect_data = {
-        "robot_id": "ot2_demo",
-        "host_alias": "ot2_tailscale",
-        "password": "accelerate",
-        "max_retries": 3,
-        "command_timeout": 30
-    }
+        # Status and homing don't depend on each other, so send both at once
+        logger.info("\n📊 Checking robot status and 🏠 homing robot...")
+        status, home_status_code = await asyncio.gather(
+            get_robot_status(client, "ot2_demo"),
+            _post_noread(client, "/robots/ot2_demo/home")
+        )
+        if status is not None:
+            logger.info("✅ Robot status retrieved")
+            logger.info("   Status: %s", status)
+        if home_status_code == 200:
+            logger.info("✅ Robot homed successfully")
     
-    response = requests.post(f"{API_BASE}/robots/ot2_demo/connect", json=connect_data)
-    if response.status_code == 200:
-        print("✅ Robot connected successfully")
-        print(f"   Response: {response.json()}")
-    else:
-        print(f"❌ Connection failed: {response.text}")
-        return
+        # Setup protocol
+        logger.info("\n⚙️  Setting up protocol...")
+        setup_data = {
+            "labware": [
+                {
+                    "nickname": "tips_300",
+                    "loadname": "opentrons_96_tiprack_300ul", 
+                    "location": "1",
+                    "ot_default": True
+                },
+                {
+                    "nickname": "plate_96",
+                    "loadname": "corning_96_wellplate_360ul_flat",
+                    "location": "2", 
+                    "ot_default": True
+                }
+            ],
+            "instruments": [
+                {
+                    "nickname": "p300",
+                    "instrument_name": "p300_single_gen2",
+                    "mount": "right",
+                    "ot_default": True
+                }
+            ]
+        }
+    
+        response = await client.post("/robots/ot2_demo/setup", content=orjson.dumps(setup_data), headers=JSON_HEADERS)
+        if response.status_code == 200:
+            logger.info("✅ Protocol setup completed")
+            if logger.isEnabledFor(logging.INFO):  # skip the JSON parse when nobody will see it
+                logger.info("   Setup: %s", orjson.loads(response.content))
     
-    # Get robot status
-    print("\n📊 Checking robot status...")
-    response = requests.get(f"{API_BASE}/robots/ot2_demo/status")
-    if response.status_code == 200:
-        print("✅ Robot status retrieved")
-        print(f"   Status: {response.json()}")
+        # Execute liquid handling
+        logger.info("\n💧 Executing liquid handling...")
+        aspirate_data = {
+            "pip_name": "p300",
+            "volume": 100,
+            "location": {
+                "labware_nickname": "plate_96",
+                "position": "A1",
+                "center": True
+            }
+        }
     
-    # Home the robot
-    print("\n🏠 Homing robot...")
-    response = requests.post(f"{API_BASE}/robots/ot2_demo/home")
-    if response.status_code == 200:
-        print("✅ Robot homed successfully")
+        # Note: This would require tips to be loaded first in a real scenario
+        # response = await client.post("/robots/ot2_demo/aspirate", content=orjson.dumps(aspirate_data), headers=JSON_HEADERS)
     
-    # Setup protocol
-    print("\n⚙️  Setting up protocol...")
-    setup_data = {
+        # Disconnect
+        logger.info("\n🔌 Disconnecting...")
+        if await _delete_noread(client, "/robots/ot2_demo/disconnect") == 200:
+            logger.info("✅ Robot disconnected")
+
+# Step and assay templates are fixed, so they are built once at import rather than per demo call
+_PREPARATION_STEPS = (
+    {
         "labware": [
+            {"nickname": "tips_300", "loadname": "opentrons_96_tiprack_300ul", "location": "1"},
+            {"nickname": "source_plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "2"},
+            {"nickname": "dest_plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "3"}
+        ],
+        "instruments": [
+            {"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right"}
+        ],
+        "operations": [
             {
-                "nickname": "tips_300",
-                "loadname": "opentrons_96_tiprack_300ul", 
-                "location": "1",
-                "ot_default": True
+                "type": "pick_up_tip",
+                "description": "Pick up tip for transfers",
+                "labware": "tips_300",
+                "position": "A1",
+                "pipette": "p300"
             },
             {
-                "nickname": "plate_96",
-                "loadname": "corning_96_wellplate_360ul_flat",
-                "location": "2", 
-                "ot_default": True
-            }
-        ],
-        "instruments": [
+                "type": "aspirate",
+                "description": "Aspirate from source",
+                "labware": "source_plate",
+                "position": "A1",
+                "pipette": "p300",
+                "volume": 100,
+                "offset": {"bottom": 5}
+            },
+            {
+                "type": "dispense", 
+                "description": "Dispense to destination",
+                "labware": "dest_plate",
+                "position": "A1",
+                "pipette": "p300",
+                "volume": 100,
+                "offset": {"top": -1}
+            },
             {
-                "nickname": "p300",
-                "instrument_name": "p300_single_gen2",
-                "mount": "right",
-                "ot_default": True
+                "type": "drop_tip",
+                "description": "Drop tip",
+                "pipette": "p300"
             }
         ]
-    }
-    
-    response = requests.post(f"{API_BASE}/robots/ot2_demo/setup", json=setup_data)
-    if response.status_code == 200:
-        print("✅ Protocol setup completed")
-        print(f"   Setup: {response.json()}")
-    
-    # Execute liquid handling
-    print("\n💧 Executing liquid handling...")
-    aspirate_data = {
-        "pip_name": "p300",
-        "volume": 100,
-        "location": {
-            "labware_nickname": "plate_96",
-            "position": "A1",
-            "center": True
+    },
+)
+
+_ASSAY_PARAMETERS = {
+    "preparation_steps": [
+        {
+            "labware": [
+                {"nickname": "compound_plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "1"},
+                {"nickname": "assay_plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "2"},
+                {"nickname": "tips_20", "loadname": "opentrons_96_tiprack_20ul", "location": "3"}
+            ],
+            "instruments": [
+                {"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left"}
+            ],
+            "operations": [
+                {
+                    "type": "delay",
+                    "description": "Equilibration delay",
+                    "seconds": 30
+                }
+            ]
         }
-    }
-    
-    # Note: This would require tips to be loaded first in a real scenario
-    # response = requests.post(f"{API_BASE}/robots/ot2_demo/aspirate", json=aspirate_data)
-    
-    # Disconnect
-    print("\n🔌 Disconnecting...")
-    response = requests.delete(f"{API_BASE}/robots/ot2_demo/disconnect")
-    if response.status_code == 200:
-        print("✅ Robot disconnected")
+    ]
+}
+
+# Mock instruments for the orchestrator demo (replace with real instrument clients)
+class MockHPLC:
+    def run_analysis(self, samples):
+        return {"status": "completed", "results": f"Analyzed {len(samples)} samples"}
+
+
+class MockSpectrophotometer:
+    def measure_absorbance(self, wavelength):
+        return {"absorbance": 0.85, "wavelength": wavelength}
+
 
 def demo_workflow_orchestrator():
     """Demonstrate Prefect workflow orchestrator"""
-    print("\n🔄 Workflow Orchestrator Demo")
-    print("=" * 50)
+    logger.info("\n🔄 Workflow Orchestrator Demo")
+    logger.info("=" * 50)
     
     # Register instruments
-    print("📝 Registering instruments...")
+    logger.info("📝 Registering instruments...")
     
     # Register OT-2 robot
     if register_ot2_robot("ot2_main", "ot2_tailscale"):
-        print("✅ OT-2 robot registered: ot2_main")
+        logger.info("✅ OT-2 robot registered: ot2_main")
     else:
-        print("❌ Failed to register OT-2 robot")
+        logger.error("❌ Failed to register OT-2 robot")
         return
     
     # Register mock instruments (replace with real instrument clients)
-    class MockHPLC:
-        def run_analysis(self, samples):
-            return {"status": "completed", "results": f"Analyzed {len(samples)} samples"}
-    
-    class MockSpectrophotometer:
-        def measure_absorbance(self, wavelength):
-            return {"absorbance": 0.85, "wavelength": wavelength}
-    
     register_instrument("hplc_01", MockHPLC())
     register_instrument("spec_01", MockSpectrophotometer())
-    print("✅ Mock instruments registered")
+    logger.info("✅ Mock instruments registered")
     
     # Define sample preparation workflow
-    print("\n🧪 Running sample preparation workflow...")
+    logger.info("\n🧪 Running sample preparation workflow...")
     
     samples = [
         {"id": "sample_001", "type": "compound_A"},
@@ -169,62 +282,20 @@ def demo_workflow_orchestrator():
         {"id": "sample_003", "type": "compound_C"}
     ]
     
-    preparation_steps = [
-        {
-            "labware": [
-                {"nickname": "tips_300", "loadname": "opentrons_96_tiprack_300ul", "location": "1"},
-                {"nickname": "source_plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "2"},
-                {"nickname": "dest_plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "3"}
-            ],
-            "instruments": [
-                {"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right"}
-            ],
-            "operations": [
-                {
-                    "type": "pick_up_tip",
-                    "description": "Pick up tip for transfers",
-                    "labware": "tips_300",
-                    "position": "A1",
-                    "pipette": "p300"
-                },
-                {
-                    "type": "aspirate",
-                    "description": "Aspirate from source",
-                    "labware": "source_plate",
-                    "position": "A1",
-                    "pipette": "p300",
-                    "volume": 100,
-                    "offset": {"bottom": 5}
-                },
-                {
-                    "type": "dispense", 
-                    "description": "Dispense to destination",
-                    "labware": "dest_plate",
-                    "position": "A1",
-                    "pipette": "p300",
-                    "volume": 100,
-                    "offset": {"top": -1}
-                },
-                {
-                    "type": "drop_tip",
-                    "description": "Drop tip",
-                    "pipette": "p300"
-                }
-            ]
-        }
-    ]
+    # the orchestrator only reads the steps, so the shared template needs no deep copy
+    preparation_steps = list(_PREPARATION_STEPS)
     
     try:
         # Run the workflow
         result = sample_preparation_workflow("ot2_main", samples, preparation_steps)
-        print("✅ Sample preparation workflow completed")
-        print(f"   Results: {result}")
+        logger.info("✅ Sample preparation workflow completed")
+        logger.info("   Results: %s", result)
         
     except Exception as e:
-        print(f"❌ Workflow failed: {e}")
+        logger.error("❌ Workflow failed: %s", e)
     
     # Demonstrate analytical workflow
-    print("\n🔬 Running analytical workflow...")
+    logger.info("\n🔬 Running analytical workflow...")
     
     analysis_parameters = {
         "preparation_steps": preparation_steps,
@@ -244,11 +315,11 @@ def demo_workflow_orchestrator():
             samples,
             analysis_parameters
         )
-        print("✅ Analytical workflow completed")
-        print(f"   Results: {result}")
+        logger.info("✅ Analytical workflow completed")
+        logger.info("   Results: %s", result)
         
     except Exception as e:
-        print(f"❌ Analytical workflow failed: {e}")
+        logger.error("❌ Analytical workflow failed: %s", e)
 
 def demo_high_throughput_screening():
     """Demonstrate high-throughput screening workflow"""
@@ -256,37 +327,18 @@ def demo_high_throughput_screening():
     print("=" * 50)
     
     # Simulate compound library
-    compound_library = []
-    for i in range(96):  # Full 96-well plate
-        compound_library.append({
+    compound_library = [
+        {
             "id": f"compound_{i+1:03d}",
             "molecular_weight": 250 + (i * 2),
             "concentration": 10.0,  # mM
-            "plate_position": f"{chr(65 + i//12)}{(i%12)+1}"
-        })
+            "plate_position": WELLS_96[i]
+        }
+        for i in range(96)  # Full 96-well plate
+    ]
     
     # Assay parameters
-    assay_parameters = {
-        "preparation_steps": [
-            {
-                "labware": [
-                    {"nickname": "compound_plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "1"},
-                    {"nickname": "assay_plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "2"},
-                    {"nickname": "tips_20", "loadname": "opentrons_96_tiprack_20ul", "location": "3"}
-                ],
-                "instruments": [
-                    {"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left"}
-                ],
-                "operations": [
-                    {
-                        "type": "delay",
-                        "description": "Equilibration delay",
-                        "seconds": 30
-                    }
-                ]
-            }
-        ]
-    }
+    assay_parameters = _ASSAY_PARAMETERS
     
     # Register multiple robots for parallel processing
     robot_ids = ["ot2_main"]  # In real scenario, you'd have multiple robots
@@ -307,6 +359,19 @@ def demo_high_throughput_screening():
 
 def main():
     """Main demonstration function"""
+    # Demo choice comes from --demo or OT_DEMO so runs don't wait on a TTY
+    demos = ["1", "2", "3", "4"]
+    parser = argparse.ArgumentParser(description="OT-2 integration demos")
+    parser.add_argument("--demo", choices=demos, default=os.getenv("OT_DEMO", "2"),
+                        help="1: REST API, 2: workflow orchestrator, 3: HTS, 4: all (default: $OT_DEMO or 2)")
+    args = parser.parse_args()
+    # argparse doesn't check defaults against choices, so a bad OT_DEMO is caught here
+    if args.demo not in demos:
+        parser.error(f"OT_DEMO must be one of {', '.join(demos)}, got {args.demo!r}")
+    # LOG_LEVEL=ERROR silences the step-by-step demo output (and its formatting) for timing runs
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s",
+                        handlers=[logging.StreamHandler()])
+
     print("🧬 OT-2 Integration Demo")
     print("=" * 60)
     print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -319,21 +384,19 @@ def main():
     print("3. High-Throughput Screening")
     print("4. All demos")
     
-    choice = input("\nSelect demo (1-4): ").strip()
+    choice = args.demo
+    print(f"\nRunning demo {choice}")
     
     if choice == "1":
-        demo_rest_api_usage()
+        asyncio.run(demo_rest_api_usage())
     elif choice == "2":
         demo_workflow_orchestrator()
     elif choice == "3":
         demo_high_throughput_screening()
     elif choice == "4":
-        demo_rest_api_usage()
+        asyncio.run(demo_rest_api_usage())
         demo_workflow_orchestrator()
         demo_high_throughput_screening()
-    else:
-        print("Invalid choice. Running workflow orchestrator demo...")
-        demo_workflow_orchestrator()
     
     print("\n🎉 Demo completed!")
     print("\nNext steps:")
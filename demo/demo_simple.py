@@ -1,11 +1,36 @@
 import sys
+from importlib.util import find_spec
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Fall back to the checkout's src/ only when the package isn't installed (pip install -e .)
+if find_spec("opentrons_workflows") is None:
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from opentrons_workflows import OpentronsControl
 
+# The public API doesn't change at runtime, so list it once at import
+_PUBLIC_METHODS = tuple(m for m in dir(OpentronsControl) if not m.startswith("_"))
+
+# Static closing notes, written in one go
+_REQUIREMENTS_TEXT = f"""
+🔗 Connection Requirements:
+{"=" * 40}
+  • Robot must be accessible via SSH
+  • Environment variables or SSH config required:
+    - HOSTNAME (robot IP)
+    - USERNAME (robot username)
+    - KEY_FILE_PATH (SSH key path)
+  • Or use host_alias with SSH config
+
+📁 For working examples, see:
+  • demo/demo_ot2_control.py
+  • demo/demo_flex_control.py
+  • demo/pdb_samp_prep.py
+  • demo/snar_test.py
+
+✅ Demo completed!
+"""
+
 
 def demo_simple():
     """Simple demo showing OpentronsControl API usage (requires robot connection)"""
@@ -17,9 +42,7 @@ def demo_simple():
     print("=" * 40)
     
     # Show available methods
-    methods = [method for method in dir(OpentronsControl) if not method.startswith('_')]
-    for method in methods:
-        print(f"  • {method}")
+    sys.stdout.write("\n".join(f"  • {m}" for m in _PUBLIC_METHODS) + "\n")
     
     print()
     print("📖 Example Usage:")
@@ -51,13 +74,10 @@ ot.load_instrument(instrument)
 # Home the robot
 ot.home()
 
-# Get location and move pipette
-ot.get_location_from_labware(labware_nickname="plate_96_1", position="A1", top=-1)
-ot.move_to_pip(pip_name="p300")
-
-# Aspirate and dispense
-ot.aspirate(pip_name="p300", volume=100)
-ot.dispense(pip_name="p300", volume=100)
+# Aspirate and dispense at a labware location, one command each
+well = {"labware_nickname": "plate_96_1", "position": "A1", "top": -1}
+ot.aspirate(pip_name="p300", volume=100, location=well)
+ot.dispense(pip_name="p300", volume=100, location=well)
 
 # Close session
 ot.close_session()
@@ -65,23 +85,7 @@ ot.close_session()
     
     print(example_code)
     
-    print()
-    print("🔗 Connection Requirements:")
-    print("=" * 40)
-    print("  • Robot must be accessible via SSH")
-    print("  • Environment variables or SSH config required:")
-    print("    - HOSTNAME (robot IP)")
-    print("    - USERNAME (robot username)")
-    print("    - KEY_FILE_PATH (SSH key path)")
-    print("  • Or use host_alias with SSH config")
-    print()
-    print("📁 For working examples, see:")
-    print("  • demo/demo_ot2_control.py")
-    print("  • demo/demo_flex_control.py")
-    print("  • demo/pdb_samp_prep.py")
-    print("  • demo/snar_test.py")
-    print()
-    print("✅ Demo completed!")
+    sys.stdout.write(_REQUIREMENTS_TEXT)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 from prefect import flow
 from opentrons_workflows import OpentronsControl
 
-@flow(log_prints=True)
+@flow(log_prints=False, persist_result=False)
 def demo_flex(simulation: bool = True):
     ot=OpentronsControl(host_alias="otflex", password="accelerate", simulation=simulation)
     ot.home()
@@ -12,13 +12,11 @@ def demo_flex(simulation: bool = True):
     tips=[
         {"nickname": "tip_1000_96_1", "loadname": "opentrons_flex_96_filtertiprack_1000ul", "location": "B1", "ot_default": True, "config": {}}
     ]
-    for plate in plates:
-        ot.load_labware(plate)
-    for tip in tips:
-        ot.load_labware(tip)
-
-    ot.load_instrument({"nickname": "p1000", "instrument_name": "flex_1channel_1000", "mount" : "left", "ot_default": True})
-    ot.load_module({"nickname": "hs", "module_name": "heaterShakerModuleV1", "location": "A1", "adapter": "opentrons_universal_flat_adapter"})
+    # deck setup goes to the robot in one round trip
+    with ot.batch():
+        ot.load_labware_batch(plates + tips)
+        ot.load_instrument({"nickname": "p1000", "instrument_name": "flex_1channel_1000", "mount" : "left", "ot_default": True})
+        ot.load_module({"nickname": "hs", "module_name": "heaterShakerModuleV1", "location": "A1", "adapter": "opentrons_universal_flat_adapter"})
 
 
     # ot.move_labware_w_gripper(labware_nickname="plate_96_1", new_location="C3")
@@ -48,4 +46,4 @@ def demo_flex(simulation: bool = True):
 
     # ot.return_tip(pip_name="p1000")
 
-    ot.close_session()
\ No newline at end of file
+    ot.close_session_async()
\ No newline at end of file
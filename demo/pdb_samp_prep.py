@@ -1,16 +1,16 @@
-from prefect import flow
-from opentrons_workflows import OpentronsControl
+from prefect import flow, get_run_logger
+from opentrons_workflows import OpentronsControl, load_labware_def
+from opentrons_workflows._wells import WELLS_96, WELLS_24_BY_6, WELLS_C_ONWARD
 
-@flow(log_prints=True)
+
+@flow(log_prints=False, persist_result=False)
 def demo_ot2(simulation:bool = True):
+    logger = get_run_logger()
     ot = OpentronsControl(host_alias="ot2", password = "accelerate", simulation=simulation)
     ot.home()
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json"), "r") as f:
-        plate_1 = json.load(f)
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_1_beaker_30000ul.json"), "r") as f:
-        beaker_1 = json.load(f)
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_96_tiprack_10ul.json"), "r") as f:
-        tips_1 = json.load(f)
+    plate_1 = load_labware_def(r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json")
+    beaker_1 = load_labware_def(r"C:\Users\aag\Downloads\matterlab_1_beaker_30000ul.json")
+    tips_1 = load_labware_def(r"C:\Users\aag\Downloads\matterlab_96_tiprack_10ul.json")
 
     plates = [
         {"nickname": "plate_96_1", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True, "config": {}},
@@ -25,84 +25,70 @@ def demo_ot2(simulation:bool = True):
         {"nickname": "tip_20_96_1", "config": tips_1, "location": "7", "ot_default": False},
         {"nickname": "tip_300_96_1", "loadname": "opentrons_96_tiprack_300ul", "location": "8", "ot_default": True, "config": {}},
     ]
-    for plate in plates:
-        ot.load_labware(plate)
-    for tip in tips:
-        ot.load_labware(tip)
-
-    ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left", "ot_default": True})
-    ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right", "ot_default": True})
+    # deck setup goes to the robot in one round trip
+    with ot.batch():
+        ot.load_labware_batch(plates + tips)
+        ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left", "ot_default": True})
+        ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right", "ot_default": True})
     
     ot.get_location_from_labware(labware_nickname="tip_300_96_1", position= "A1", top=0)
     ot.pick_up_tip(pip_name="p300")
     sample_num=48
-    for i in range(0, sample_num):
-        target_loc = f"{chr(65+i//12)}{i%12+1}"
-        print(f"add to {target_loc}")
-
-        ot.get_location_from_labware(labware_nickname="beaker", position="A1", bottom=5)
-        ot.move_to_pip(pip_name="p300")
-        ot.aspirate(pip_name="p300", volume=150)
-
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc, top=-1)
-        ot.move_to_pip(pip_name="p300")
-        ot.dispense(pip_name="p300", volume=150)
-        ot.blow_out(pip_name="p300")        
+    target_locs = WELLS_96[:sample_num]
+    logger.info("beaker phase targets: %s", ", ".join(target_locs))
+    # one 300 uL aspirate from the beaker serves two wells
+    for k in range(0, sample_num, 2):
+        ot.dispense_sequence(
+            pip_name="p300", volume=150,
+            source={"labware_nickname": "beaker", "position": "A1", "bottom": 5},
+            target=[
+                {"labware_nickname": "plate_96_1", "position": target_locs[k], "top": -1},
+                {"labware_nickname": "plate_96_1", "position": target_locs[k+1], "top": -1},
+            ],
+        )
     ot.return_tip(pip_name="p300")
 
     for i in range(0, 24):
-        source_loc = f"{chr(65+i//6)}{i%6+1}"
-        target_loc = f"{chr(65+i//12)}{i%12+1}"
-
-        ot.get_location_from_labware(labware_nickname="tip_20_96_1", position=target_loc, top=0)
-        ot.pick_up_tip(pip_name="p20")
-
-        ot.get_location_from_labware(labware_nickname="vial_24_well_1", position=source_loc, bottom=5)
-        ot.move_to_pip("p20")
-        ot.aspirate(pip_name="p20", volume=10)
-        
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc, top=-1)
-        ot.move_to_pip("p20")
-        ot.dispense(pip_name="p20", volume=10)
-        ot.blow_out(pip_name="p20")
-
-        ot.drop_tip("p20")
+        source_loc = WELLS_24_BY_6[i]
+        target_loc = WELLS_96[i]
+
+        ot.dispense_sequence(
+            pip_name="p20", volume=10,
+            tip={"labware_nickname": "tip_20_96_1", "position": target_loc, "top": 0},
+            source={"labware_nickname": "vial_24_well_1", "position": source_loc, "bottom": 5},
+            target={"labware_nickname": "plate_96_1", "position": target_loc, "top": -1},
+            drop_tip=True,
+        )
     
     for i in range(0, 24):
-        source_loc = f"{chr(65+i//6)}{i%6+1}"
-        target_loc = f"{chr(67+i//12)}{i%12+1}"
-
-        ot.get_location_from_labware(labware_nickname="tip_20_96_1", position=target_loc, top=0)
-        ot.pick_up_tip(pip_name="p20")
-
-        ot.get_location_from_labware(labware_nickname="vial_24_well_2", position=source_loc, bottom=5)
-        ot.move_to_pip("p20")
-        ot.aspirate(pip_name="p20", volume=10)
-        
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc, bottom=1)
-        ot.move_to_pip("p20")
-        ot.dispense(pip_name="p20", volume=10)
-        ot.blow_out(pip_name="p20")
-
-        ot.drop_tip("p20")
+        source_loc = WELLS_24_BY_6[i]
+        target_loc = WELLS_C_ONWARD[i]
+
+        ot.dispense_sequence(
+            pip_name="p20", volume=10,
+            tip={"labware_nickname": "tip_20_96_1", "position": target_loc, "top": 0},
+            source={"labware_nickname": "vial_24_well_2", "position": source_loc, "bottom": 5},
+            target={"labware_nickname": "plate_96_1", "position": target_loc, "bottom": 1},
+            drop_tip=True,
+        )
         
         
     ot.get_location_from_labware(labware_nickname="tip_300_96_1", position= "A1", top=0)
     ot.pick_up_tip(pip_name="p300")
     sample_num=48
-    for i in range(0, sample_num):
-        target_loc = f"{chr(65+i//12)}{i%12+1}"
-        print(f"add to {target_loc}")
-
-        ot.get_location_from_labware(labware_nickname="beaker", position="A1", bottom=5)
-        ot.move_to_pip(pip_name="p300")
-        ot.aspirate(pip_name="p300", volume=150)
-
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc, top=-1)
-        ot.move_to_pip(pip_name="p300")
-        ot.dispense(pip_name="p300", volume=150)
-        ot.blow_out(pip_name="p300")        
+    target_locs = WELLS_96[:sample_num]
+    logger.info("beaker phase targets: %s", ", ".join(target_locs))
+    # one 300 uL aspirate from the beaker serves two wells
+    for k in range(0, sample_num, 2):
+        ot.dispense_sequence(
+            pip_name="p300", volume=150,
+            source={"labware_nickname": "beaker", "position": "A1", "bottom": 5},
+            target=[
+                {"labware_nickname": "plate_96_1", "position": target_locs[k], "top": -1},
+                {"labware_nickname": "plate_96_1", "position": target_locs[k+1], "top": -1},
+            ],
+        )
     ot.return_tip(pip_name="p300")
        
 
-    ot.close_session()
+    ot.close_session_async()
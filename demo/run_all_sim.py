@@ -0,0 +1,20 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import snar_test
+
+# flows that simulate in-process (local=True), so they share nothing and can run side by side
+SIM_FLOWS = ["demo_ot2", "workup_ot2", "redilution_ot2"]
+
+
+def _run(flow_name: str):
+    # flow objects don't pickle cleanly, so each worker looks its flow up by name
+    getattr(snar_test, flow_name)(simulation=True)
+    return flow_name
+
+
+if __name__ == "__main__":
+    # one interpreter per flow: wall time is the slowest flow instead of the sum
+    with ProcessPoolExecutor(max_workers=min(len(SIM_FLOWS), os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(_run, name) for name in SIM_FLOWS]
+        for future in as_completed(futures):
+            print(f"✅ {future.result()} simulated")
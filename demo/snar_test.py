@@ -1,18 +1,39 @@
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from prefect import flow
-from pathlib import Path
-import json
-from opentrons_workflows import OpentronsControl
+from opentrons_workflows import OpentronsControl, load_labware_def
+from opentrons_workflows._wells import WELLS_96, WELLS_24_BY_6, WELLS_C_ONWARD, WELLS_E_ONWARD
 
-@flow(log_prints=True)
+
+# labware files are parsed here while get_robot connects and homes
+_labware_executor = ThreadPoolExecutor(max_workers=3)
+
+_robots = {}
+_robots_lock = threading.Lock()
+
+
+def get_robot(simulation: bool) -> OpentronsControl:
+    # chained flows share one session: only the first pays for connect + home, and close_session runs once at exit
+    with _robots_lock:
+        if simulation not in _robots:
+            # dry runs simulate in this process (needs opentrons installed locally); only real runs go over SSH
+            ot = OpentronsControl(host_alias="ot2", password = "accelerate", simulation=simulation, local=simulation)
+            ot.home()
+            atexit.register(ot.close_session)
+            _robots[simulation] = ot
+        return _robots[simulation]
+
+
+@flow(log_prints=False, persist_result=False)
 def demo_ot2(simulation:bool = True):
-    ot = OpentronsControl(host_alias="ot2", password = "accelerate", simulation=simulation)
-    ot.home()
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json"), "r") as f:
-        plate_1 = json.load(f)
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_12_vialplate_20000ul.json"), "r") as f:
-        plate_2 = json.load(f)
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_96_tiprack_10ul.json"), "r") as f:
-        tips_1 = json.load(f)
+    labware = _labware_executor.map(load_labware_def, (
+        r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json",
+        r"C:\Users\aag\Downloads\matterlab_12_vialplate_20000ul.json",
+        r"C:\Users\aag\Downloads\matterlab_96_tiprack_10ul.json",
+    ))
+    ot = get_robot(simulation)
+    plate_1, plate_2, tips_1 = labware
 
     plates = [
         {"nickname": "plate_96_1", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True, "config": {}},
@@ -23,94 +44,68 @@ def demo_ot2(simulation:bool = True):
         {"nickname": "tip_20_96_1", "config": tips_1, "location": "7", "ot_default": False},
         {"nickname": "tip_300_96_1", "loadname": "opentrons_96_tiprack_300ul", "location": "8", "ot_default": True, "config": {}},
     ]
-    for plate in plates:
-        ot.load_labware(plate)
-    for tip in tips:
-        ot.load_labware(tip)
-
-    ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left", "ot_default": True})
-    ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right", "ot_default": True})
+    # deck setup goes to the robot in one round trip
+    with ot.batch():
+        ot.load_labware_batch(plates + tips)
+        ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left", "ot_default": True, "tip_racks": ["tip_20_96_1"]})
+        ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right", "ot_default": True})
     
     
     sample_num=24
 
-    ot.get_location_from_labware(labware_nickname="tip_300_96_1", position= "A1", top=0)
-    ot.pick_up_tip(pip_name="p300")
-
-    # distribute NaHS to each well, 200 uL
-    for i in range(0, sample_num):
-        target_loc_1 = f"{chr(65+i//12)}{i%12+1}"
-        print(f"add to {target_loc_1}")
-
-        ot.get_location_from_labware(labware_nickname="vial_12_well_1", position="A1", bottom=10)
-        ot.move_to_pip(pip_name="p300")
-        ot.aspirate(pip_name="p300", volume=200)
-
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc_1, top=-1)
-        ot.move_to_pip(pip_name="p300")
-        ot.dispense(pip_name="p300", volume=200)
-        ot.blow_out(pip_name="p300")        
-    ot.drop_tip("p300")
-
-    # distribute NaOMe to each well, 200 uL
-    ot.get_location_from_labware(labware_nickname="tip_300_96_1", position= "A2", top=0)
-    ot.pick_up_tip(pip_name="p300")
-
-    for i in range(0, sample_num):
-        target_loc_1 = f"{chr(67+i//12)}{i%12+1}"
-        print(f"add to {target_loc_1}")
-
-        ot.get_location_from_labware(labware_nickname="vial_12_well_1", position="A2", bottom=10)
-        ot.move_to_pip(pip_name="p300")
-        ot.aspirate(pip_name="p300", volume=200)
-
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc_1, top=-1)
-        ot.move_to_pip(pip_name="p300")
-        ot.dispense(pip_name="p300", volume=200)
-        ot.blow_out(pip_name="p300")        
-    ot.drop_tip("p300")
-
-    for i in range(0, sample_num):
-        source_loc = f"{chr(65+i//6)}{i%6+1}"
-        target_loc_1 = f"{chr(65+i//12)}{i%12+1}"
-        target_loc_2 = f"{chr(67+i//12)}{i%12+1}"
-
-        ot.get_location_from_labware(labware_nickname="tip_20_96_1", position=target_loc_1, top=0)
-        ot.pick_up_tip(pip_name="p20")
-
-        ot.get_location_from_labware(labware_nickname="vial_24_well_1", position=source_loc, bottom=10)
-        ot.move_to_pip("p20")
-        ot.aspirate(pip_name="p20", volume=10)
-        
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc_1, top=1)
-        ot.move_to_pip("p20")
-        ot.dispense(pip_name="p20", volume=10)
-        ot.blow_out(pip_name="p20")
-
-        ot.get_location_from_labware(labware_nickname="vial_24_well_1", position=source_loc, bottom=10)
-        ot.move_to_pip("p20")
-        ot.aspirate(pip_name="p20", volume=10)
-
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc_2, top=1)
-        ot.move_to_pip("p20")
-        ot.dispense(pip_name="p20", volume=10)
-        ot.blow_out(pip_name="p20")
-
-        ot.drop_tip("p20")      
-
-    ot.close_session()
-
-
-@flow(log_prints=True)
+    # the whole liquid-handling run goes to the robot as one program
+    with ot.batch():
+        ot.get_location_from_labware(labware_nickname="tip_300_96_1", position= "A1", top=0)
+        ot.pick_up_tip(pip_name="p300")
+
+        # distribute NaHS to each well, 200 uL
+        ot.transfer(
+            pip_name="p300", volume=200,
+            source={"labware_nickname": "vial_12_well_1", "position": "A1", "bottom": 10},
+            target=[{"labware_nickname": "plate_96_1", "position": well, "top": -1} for well in WELLS_96[:sample_num]],
+            new_tip="never",
+        )
+        ot.drop_tip("p300")
+
+        # distribute NaOMe to each well, 200 uL
+        ot.get_location_from_labware(labware_nickname="tip_300_96_1", position= "A2", top=0)
+        ot.pick_up_tip(pip_name="p300")
+
+        ot.transfer(
+            pip_name="p300", volume=200,
+            source={"labware_nickname": "vial_12_well_1", "position": "A2", "bottom": 10},
+            target=[{"labware_nickname": "plate_96_1", "position": well, "top": -1} for well in WELLS_C_ONWARD[:sample_num]],
+            new_tip="never",
+        )
+        ot.drop_tip("p300")
+
+        for i in range(0, sample_num):
+            source_loc = WELLS_24_BY_6[i]
+            target_loc_1 = WELLS_96[i]
+            target_loc_2 = WELLS_C_ONWARD[i]
+
+            # one 20 uL aspirate serves both target wells
+            ot.dispense_sequence(
+                pip_name="p20", volume=10,
+                tip=True,
+                source={"labware_nickname": "vial_24_well_1", "position": source_loc, "bottom": 10},
+                target=[
+                    {"labware_nickname": "plate_96_1", "position": target_loc_1, "top": 1},
+                    {"labware_nickname": "plate_96_1", "position": target_loc_2, "top": 1},
+                ],
+                drop_tip=True,
+            )
+
+
+@flow(log_prints=False, persist_result=False)
 def workup_ot2(simulation:bool = True):
-    ot = OpentronsControl(host_alias="ot2", password = "accelerate", simulation=simulation)
-    ot.home()
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json"), "r") as f:
-        plate_1 = json.load(f)
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_12_vialplate_20000ul.json"), "r") as f:
-        plate_2 = json.load(f)
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_96_tiprack_10ul.json"), "r") as f:
-        tips_1 = json.load(f)
+    labware = _labware_executor.map(load_labware_def, (
+        r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json",
+        r"C:\Users\aag\Downloads\matterlab_12_vialplate_20000ul.json",
+        r"C:\Users\aag\Downloads\matterlab_96_tiprack_10ul.json",
+    ))
+    ot = get_robot(simulation)
+    plate_1, plate_2, tips_1 = labware
 
     plates = [
         {"nickname": "plate_96_1", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True, "config": {}},
@@ -122,13 +117,11 @@ def workup_ot2(simulation:bool = True):
         {"nickname": "tip_20_96_1", "config": tips_1, "location": "7", "ot_default": False},
         {"nickname": "tip_300_96_1", "loadname": "opentrons_96_tiprack_300ul", "location": "8", "ot_default": True, "config": {}},
     ]
-    for plate in plates:
-        ot.load_labware(plate)
-    for tip in tips:
-        ot.load_labware(tip)
-
-    ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left", "ot_default": True})
-    ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right", "ot_default": True})
+    # deck setup goes to the robot in one round trip
+    with ot.batch():
+        ot.load_labware_batch(plates + tips)
+        ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left", "ot_default": True})
+        ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right", "ot_default": True, "tip_racks": ["tip_300_96_1"]})
     
     
     sample_num=24
@@ -138,7 +131,7 @@ def workup_ot2(simulation:bool = True):
 
     # # distribute FA/DMF to each reaction well, 100 uL
     # for i in range(0, sample_num):
-    #     target_loc = f"{chr(65+i//12)}{i%12+1}"
+    #     target_loc = WELLS_96[i]
     #     print(f"add to {target_loc}")
 
     #     ot.get_location_from_labware(labware_nickname="vial_12_well_1", position="A3", bottom=10)
@@ -152,26 +145,17 @@ def workup_ot2(simulation:bool = True):
     # ot.drop_tip("p300")
 
     # distribute ACN to each hplc well, 200 uL
-    ot.get_location_from_labware(labware_nickname="tip_300_96_1", position= "A5", top=0)
-    ot.pick_up_tip(pip_name="p300")
-
-    for i in range(0, 3*sample_num):
-        target_loc = f"{chr(65+i//12)}{i%12+1}"
-        print(f"add to {target_loc}")
-
-        ot.get_location_from_labware(labware_nickname="vial_12_well_1", position="A4", bottom=10)
-        ot.move_to_pip(pip_name="p300")
-        ot.aspirate(pip_name="p300", volume=200)
-
-        ot.get_location_from_labware(labware_nickname="plate_96_2", position=target_loc, top=-1)
-        ot.move_to_pip(pip_name="p300")
-        ot.dispense(pip_name="p300", volume=200)
-        ot.blow_out(pip_name="p300")        
-    ot.drop_tip("p300")
+    ot.set_starting_tip(pip_name="p300", labware_nickname="tip_300_96_1", position="A5")
+    ot.transfer(
+        pip_name="p300", volume=200,
+        source={"labware_nickname": "vial_12_well_1", "position": "A4", "bottom": 10},
+        target=[{"labware_nickname": "plate_96_2", "position": well, "top": -1} for well in WELLS_96[:3*sample_num]],
+        new_tip="once",
+    )
 
     # # transfer 10 ul rxn sample to hplc plate
     # for i in range(0, 2* sample_num):
-    #     source_loc = f"{chr(65+i//12)}{i%12+1}"
+    #     source_loc = WELLS_96[i]
     #     target_loc = source_loc
 
     #     ot.get_location_from_labware(labware_nickname="tip_20_96_1", position=source_loc, top=0)
@@ -190,8 +174,8 @@ def workup_ot2(simulation:bool = True):
 
     # # transfer 2 ul std sample to hplc plate
     # for i in range(0, sample_num):
-    #     source_loc = f"{chr(65+i//6)}{i%6+1}"
-    #     target_loc = f"{chr(69+i//12)}{i%12+1}"
+    #     source_loc = WELLS_24_BY_6[i]
+    #     target_loc = WELLS_E_ONWARD[i]
 
     #     ot.get_location_from_labware(labware_nickname="tip_20_96_1", position=target_loc, top=0)
     #     ot.pick_up_tip(pip_name="p20")
@@ -208,19 +192,15 @@ def workup_ot2(simulation:bool = True):
     #     ot.drop_tip("p20")   
 
 
-
-    ot.close_session()
-
-@flow(log_prints=True)
+@flow(log_prints=False, persist_result=False)
 def redilution_ot2(simulation:bool = True):
-    ot = OpentronsControl(host_alias="ot2", password = "accelerate", simulation=simulation)
-    ot.home()
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json"), "r") as f:
-        plate_1 = json.load(f)
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_12_vialplate_20000ul.json"), "r") as f:
-        plate_2 = json.load(f)
-    with open(Path(r"C:\Users\aag\Downloads\matterlab_96_tiprack_20ul.json"), "r") as f:
-        tips_1 = json.load(f)
+    labware = _labware_executor.map(load_labware_def, (
+        r"C:\Users\aag\Downloads\matterlab_24_vialplate_3700ul.json",
+        r"C:\Users\aag\Downloads\matterlab_12_vialplate_20000ul.json",
+        r"C:\Users\aag\Downloads\matterlab_96_tiprack_20ul.json",
+    ))
+    ot = get_robot(simulation)
+    plate_1, plate_2, tips_1 = labware
 
     plates = [
         {"nickname": "plate_96_1", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True, "config": {}},
@@ -231,13 +211,11 @@ def redilution_ot2(simulation:bool = True):
         {"nickname": "tip_20_96_1", "config": tips_1, "location": "7", "ot_default": False},
         {"nickname": "tip_300_96_1", "loadname": "opentrons_96_tiprack_300ul", "location": "8", "ot_default": True, "config": {}},
     ]
-    for plate in plates:
-        ot.load_labware(plate)
-    for tip in tips:
-        ot.load_labware(tip)
-
-    ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left", "ot_default": True})
-    ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right", "ot_default": True})
+    # deck setup goes to the robot in one round trip
+    with ot.batch():
+        ot.load_labware_batch(plates + tips)
+        ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left", "ot_default": True, "tip_racks": ["tip_20_96_1"]})
+        ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right", "ot_default": True})
     
     
     sample_num=24
@@ -247,7 +225,7 @@ def redilution_ot2(simulation:bool = True):
     # ot.pick_up_tip(pip_name="p300")
 
     # for i in range(0, 2*sample_num):
-    #     target_loc = f"{chr(69+i//12)}{i%12+1}"
+    #     target_loc = WELLS_E_ONWARD[i]
     #     print(f"add to {target_loc}")
 
     #     ot.get_location_from_labware(labware_nickname="vial_12_well_1", position="A4", bottom=10)
@@ -261,25 +239,13 @@ def redilution_ot2(simulation:bool = True):
     # ot.drop_tip("p300")
 
     # transfer 15 ul rxn sample to hplc plate
-    for i in range(0, 2* sample_num):
-        source_loc = f"{chr(65+i//12)}{i%12+1}"
-        target_loc = f"{chr(69+i//12)}{i%12+1}"
-
-        ot.get_location_from_labware(labware_nickname="tip_20_96_1", position=source_loc, top=0)
-        ot.pick_up_tip(pip_name="p20")
-
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=source_loc, bottom=1)
-        ot.move_to_pip("p20")
-        ot.aspirate(pip_name="p20", volume=15)
-        
-        ot.get_location_from_labware(labware_nickname="plate_96_1", position=target_loc, bottom=3)
-        ot.move_to_pip("p20")
-        ot.dispense(pip_name="p20", volume=15)
-        ot.blow_out(pip_name="p20")
-
-        ot.drop_tip("p20")     
+    ot.transfer(
+        pip_name="p20", volume=15,
+        source=[{"labware_nickname": "plate_96_1", "position": well, "bottom": 1} for well in WELLS_96[:2*sample_num]],
+        target=[{"labware_nickname": "plate_96_1", "position": well, "bottom": 3} for well in WELLS_E_ONWARD[:2*sample_num]],
+        new_tip="always",
+    )
 
-    ot.close_session()
 
 if __name__ == "__main__":
     # demo_ot2(False)
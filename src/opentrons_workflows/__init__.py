@@ -17,6 +17,7 @@ from .opentrons_states import (
 
 # Utilities
 from .labware_generator import LabwareGenerator
+from .labware_defs import load_labware_def
 
 __version__ = "0.2.0"
 
@@ -40,4 +41,5 @@ __all__ = [
     
     # Utilities
     "LabwareGenerator",
+    "load_labware_def",
 ]
\ No newline at end of file
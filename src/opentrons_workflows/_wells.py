@@ -0,0 +1,16 @@
+"""
+Precomputed well names for the plate layouts used by the protocols.
+
+Indexing these tuples replaces per-iteration ``f"{chr(65+i//12)}{i%12+1}"``
+formatting in pipetting loops.
+"""
+
+# 96-well plate (8 rows x 12 columns), row-major: A1, A2, ..., H12
+WELLS_96 = tuple(f"{chr(65+i//12)}{i%12+1}" for i in range(96))
+
+# 24-vial plate (4 rows x 6 columns), row-major: A1, A2, ..., D6
+WELLS_24_BY_6 = tuple(f"{chr(65+i//6)}{i%6+1}" for i in range(24))
+
+# 96-well plate starting at row C / row E, for loops that fill the lower half of a plate
+WELLS_C_ONWARD = WELLS_96[24:]
+WELLS_E_ONWARD = WELLS_96[48:]
@@ -0,0 +1,31 @@
+"""
+Loading of custom labware definition files.
+
+Definitions are parsed once per process, so repeated or chained flows reuse the
+same dicts instead of re-reading and re-decoding the JSON files.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Union
+
+import orjson
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> Dict:
+    return orjson.loads(Path(path).read_bytes())
+
+
+def load_labware_def(path: Union[str, Path]) -> Dict:
+    """
+    Load a labware definition JSON file, parsing each file only once.
+
+    Args:
+        path (Union[str, Path]): Path to the labware definition file.
+
+    Returns:
+        Dict: The parsed definition, ready for the "config" key of a labware Dict.
+              The dict is shared between callers and must not be modified.
+    """
+    return _load(str(path))
@@ -1,9 +1,13 @@
 import json
+import orjson
 from pathlib import Path
 import logging
 from typing import Union, Dict, List, Optional
 import ast
 
+_DISPLAY_CATEGORIES = frozenset({"tipRack", "wellPlate", "reservoir", "aluminumBlock"})
+_BOTTOM_SHAPES = frozenset({"flat", "u", "v"})
+
 
 class LabwareGenerator:
     """
@@ -57,8 +61,8 @@ class LabwareGenerator:
             template_path = Path("user_scripts") / "labware_template.json"
         if not template_path.exists():
             raise FileExistsError(f"Template not found at {template_path}!")
-        with open(template_path, "r") as f:
-            self.template = json.load(f)
+        # not load_labware_def: the template is filled in place, so it can't be a shared cached dict
+        self.template = orjson.loads(template_path.read_bytes())
 
     def create_plate(self):
         """
@@ -86,7 +90,7 @@ class LabwareGenerator:
             display_name = self.design["display_name"]
         if display_category is None:
             display_category = self.design["display_category"]
-            if display_category not in ["tipRack","wellPlate","reservoir","aluminumBlock"]:
+            if display_category not in _DISPLAY_CATEGORIES:
                 raise ValueError("Unsupported display category")
 
         if tags is None:
@@ -140,15 +144,15 @@ class LabwareGenerator:
         while len(self.template["ordering"]) < plate["cols"]:
             self.template["ordering"].append([])
 
-        for col_num in range(plate["cols"]):
-            row_count_offset = 0
-            for row_num in range(plate["rows"]):
-                # Generate standard A1, B1, ... style well names
-                row_name_high_count = (self._row_count + row_count_offset) // 26
-                row_name_high = chr(ord("A") + row_name_high_count - 1) if row_name_high_count else ""
-                row_name = row_name_high + chr(ord("A") + (self._row_count + row_count_offset) % 26)
-                row_count_offset += 1
+        # Generate standard A1, B1, ... style row names once; every column reuses them
+        row_names = []
+        for row_count_offset in range(plate["rows"]):
+            row_name_high_count = (self._row_count + row_count_offset) // 26
+            row_name_high = chr(ord("A") + row_name_high_count - 1) if row_name_high_count else ""
+            row_names.append(row_name_high + chr(ord("A") + (self._row_count + row_count_offset) % 26))
 
+        for col_num in range(plate["cols"]):
+            for row_num, row_name in enumerate(row_names):
                 well_name = f"{row_name}{col_num + 1}"
                 well = {
                     "depth": plate["well_depth"],
@@ -172,9 +176,9 @@ class LabwareGenerator:
                     self.template["groups"][0]["wells"] = []
                 self.template["groups"][0]["wells"].append(well_name)
 
-        if plate.get("bottom_shape") in ["flat", "u", "v"]:
+        if plate.get("bottom_shape") in _BOTTOM_SHAPES:
             self.template["groups"][0]["metadata"]["wellBottomShape"] = plate["bottom_shape"]
-        self._row_count += row_count_offset
+        self._row_count += len(row_names)
 
     def generate_definition(self) -> Dict:
         """
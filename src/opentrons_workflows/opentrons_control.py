@@ -1,26 +1,131 @@
-from .opentrons_sshclient import SSHClient
+from .opentrons_sshclient import SSHClient, SessionState
+import atexit
 import os
-from typing import Dict
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+
+# connected clients by connection parameters, least recently used first
+_pooled_clients = OrderedDict()
+_pool_lock = threading.Lock()
+# beyond this many robots the least recently used client is closed
+_MAX_POOLED_CLIENTS = 4
+
+# generous per-step allowance for commands that run many robot motions before the prompt returns
+_STEP_TIMEOUT = 30
+
+
+def _get_sshclient(hostname: str, username: str, key_file_path: str, host_alias: str, password: str) -> SSHClient:
+    # one connected client per robot for the whole process, so a new OpentronsControl skips the TCP+SSH handshake
+    key = (hostname, username, key_file_path, host_alias, password)
+    with _pool_lock:
+        client = _pooled_clients.pop(key, None)
+        if client is None:
+            client = SSHClient(
+                hostname=hostname,
+                username=username,
+                key_file_path=key_file_path,
+                host_alias=host_alias,
+                password=password
+            )
+            connected = client.connect()
+        else:
+            connected = client.is_connected or client.connect()
+        if not connected:
+            # left out of the pool, so the next session starts from a fresh client instead of this dead one
+            return client
+        _pooled_clients[key] = client
+        while len(_pooled_clients) > _MAX_POOLED_CLIENTS:
+            _pooled_clients.popitem(last=False)[1].close()
+        return client
+
+
+@atexit.register
+def _close_pooled_clients():
+    with _pool_lock:
+        for client in _pooled_clients.values():
+            client.close()
+        _pooled_clients.clear()
+
+
+class _LocalSession:
+    """In-process stand-in for the robot's Python REPL, so simulations run without SSH (needs opentrons installed locally)"""
+
+    is_connected = True
+    session_state = SessionState.PYTHON
+
+    def __init__(self):
+        self.namespace = {"__name__": "__main__"}
+
+    def connect(self):
+        return True
+
+    def start_python_session(self):
+        return True
+
+    def execute_python_command(self, code: str, timeout: int = None) -> str:
+        # like the REPL, an expression answers with its repr and a statement with nothing
+        try:
+            try:
+                compiled = compile(code, "<robot>", "eval")
+            except SyntaxError:
+                exec(compile(code, "<robot>", "exec"), self.namespace)
+                return ""
+            value = eval(compiled, self.namespace)
+        except Exception as e:
+            raise Exception(f"Python error in command execution:\n{e!r}") from e
+        return "" if value is None else repr(value)
 
 
 class OpentronsControl:
-    def __init__(self, host_alias:str = None, password="", simulation=False):
-        self._connect(host_alias, password)
+    def __init__(self, host_alias:str = None, password="", simulation=False, local=False):
+        # local=True simulates in this process instead of on the robot, for dry runs without a network
+        if local and not simulation:
+            raise ValueError("A local session can only simulate; pass simulation=True")
+        # a single worker keeps background commands in submission order
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # holds the statements buffered by batch() per thread, so commands from the worker are never swallowed by a batch
+        self._thread_state = threading.local()
+        # custom labware definitions already bound on the robot, by loadName, so each is only sent once
+        self._sent_labware_defs = {}
+        # tags what this session loads on a shared remote protocol, so only an earlier session's labware is ever evicted
+        self._session_id = uuid.uuid4().hex
+        if local:
+            self.client = _LocalSession()
+        else:
+            self._connect(host_alias, password)
         self._get_protocol(simulation)
 
     def _connect(self, host_alias:str = None, password=""):
-        
-        self.client = SSHClient(
-            hostname=os.getenv("HOSTNAME"),
-            username=os.getenv("USERNAME"),
-            key_file_path=os.getenv("KEY_FILE_PATH"),
-            host_alias=host_alias,
-            password=password
+        self.client = _get_sshclient(
+            os.getenv("HOSTNAME"),
+            os.getenv("USERNAME"),
+            os.getenv("KEY_FILE_PATH"),
+            host_alias,
+            password
         )
-        self.client.connect()
+        if not self.client.is_connected:
+            self.client.connect()
+
+    @property
+    def _batch(self):
+        # statements buffered by this thread's batch(); None when commands go straight to the robot
+        return getattr(self._thread_state, "batch", None)
 
-    def invoke(self, code):
+    @_batch.setter
+    def _batch(self, statements):
+        self._thread_state.batch = statements
+
+    def invoke(self, code, timeout: int = None):
         """Execute Python code on the robot via SSH"""
+        if self._batch is not None:
+            self._batch.append(code)
+            return None
         if not self.client.is_connected:
             raise Exception("SSH client is not connected")
         
@@ -28,32 +133,124 @@ class OpentronsControl:
         if self.client.session_state.value != "python":
             self.client.start_python_session()
         
-        return self.client.execute_python_command(code)
+        return self.client.execute_python_command(code, timeout)
+
+    def invoke_many(self, statements: List[str], timeout: int = None):
+        """Execute several Python statements on the robot in a single round trip"""
+        if self._batch is not None:
+            self._batch.extend(statements)
+            return None
+        if len(statements) == 1:
+            return self.invoke(statements[0], timeout)
+        # exec() keeps the whole block on one REPL line, so the robot answers with a single prompt
+        block = "\n".join(statements)
+        return self.invoke(f"exec({block!r})", timeout)
+
+    @contextmanager
+    def batch(self):
+        """Buffer every command in the block and send them as one program when it exits
+
+        Calls inside the block return None, so read-backs (well_depth, get_temp, ...) belong outside it.
+        Nothing is sent if the block raises.
+        """
+        self._batch = []
+        try:
+            yield self
+            statements = self._batch
+        except BaseException:
+            # the labware definitions were never bound
+            self._sent_labware_defs = {}
+            raise
+        finally:
+            self._batch = None
+        if statements:
+            # the prompt only returns once the whole program has run, so the default timeout would cut it off
+            try:
+                self.invoke_many(statements, timeout=_STEP_TIMEOUT * len(statements))
+            except BaseException:
+                self._sent_labware_defs = {}
+                raise
+
+    def exec_batch(self, ops: List[Tuple[str, tuple, dict]]):
+        # sample ops, each a wrapper method name with its args / kwargs
+        # ops = [
+        #     ("aspirate", ("p300", 150), {"location": {"labware_nickname": "beaker", "position": "A1", "bottom": 5}}),
+        #     ("dispense", ("p300", 150), {"location": {"labware_nickname": "plate_96_1", "position": "A1", "top": -1}}),
+        #     ("blow_out", ("p300",), {"location": {"labware_nickname": "plate_96_1", "position": "A1", "top": -1}}),
+        # ]
+        with self.batch():
+            for method_name, args, kwargs in ops:
+                getattr(self, method_name)(*args, **kwargs)
+
+    def invoke_async(self, code) -> Future:
+        """Submit Python code to the robot without waiting for the result"""
+        return self._executor.submit(self.invoke, code)
 
     def _disconnect(self):
-        self.client.close()
+        # the SSH client stays open in the pool for the next session; it is closed on eviction or at process exit
+        self._executor.shutdown(wait=True)
 
     def _get_protocol(self,simulation):
-        self.invoke("from opentrons.types import Point, Location")
-        self.invoke("from opentrons import protocol_api")
-        self.invoke("import json")
-        if simulation:
-            self.invoke("from opentrons import simulate")
-            self.invoke("protocol = simulate.get_protocol_api('2.21')")
-        else:
-            self.invoke("from opentrons import execute")
-            self.invoke("protocol = execute.get_protocol_api('2.21')")
+        statements = [
+            "from opentrons.types import Point, Location",
+            "from opentrons import protocol_api",
+            "import json",
+        ]
+        mode = "simulate" if simulation else "execute"
+        # A pooled SSH client keeps its remote REPL, so a protocol built by an earlier session in the
+        # same mode is reused instead of paying get_protocol_api's hardware setup again
+        statements.append(f"from opentrons import {mode}")
+        # labware, instruments and modules already on a reused protocol are tracked, so later sessions
+        # don't load them into an occupied slot or mount
+        statements.append(
+            f"_loaded = _loaded if globals().get('_protocol_mode') == '{mode}' else {{}}"
+        )
+        statements.append(
+            f"_loaded_by = _loaded_by if globals().get('_protocol_mode') == '{mode}' else {{}}"
+        )
+        statements.append(
+            f"protocol = protocol if globals().get('_protocol_mode') == '{mode}' else {mode}.get_protocol_api('2.21')"
+        )
+        statements.append(f"_protocol_mode = '{mode}'")
+        self.invoke_many(statements)
 
-    def _load_custom_labware(self, nickname: str, labware_config:Dict, location: str):
+    def _custom_labware_statements(self, nickname: str, labware_config:Dict, location: str) -> List[str]:
         loadname = labware_config["parameters"]["loadName"]
-        self.invoke(f"{loadname}={labware_config}")
-        self.invoke(f"{nickname} = protocol.load_labware_from_definition(labware_def = {loadname}, location = '{location}')")
-
-    def _load_default_labware(self, nickname:str, loadname:str, location:str):
-        self.invoke(f"{nickname} = protocol.load_labware(load_name = '{loadname}', location = '{location}')")
-
-    def _load_default_instrument(self, nickname:str, instrument_name:str, mount:str):
-        self.invoke(f"{nickname} = protocol.load_instrument(instrument_name = '{instrument_name}', mount = '{mount}')")
+        statements = self._load_once_statements(nickname, (loadname, location), {
+            nickname: f"protocol.load_labware_from_definition(labware_def = {loadname}, location = '{location}')"}, slot=location)
+        # the remote variable named after loadName is the handle; the multi-KB definition only goes over the wire once
+        if self._sent_labware_defs.get(loadname) != labware_config:
+            statements.insert(0, f"{loadname}={labware_config}")
+        return statements
+
+    def _default_labware_statements(self, nickname:str, loadname:str, location:str) -> List[str]:
+        return self._load_once_statements(nickname, (loadname, location), {
+            nickname: f"protocol.load_labware(load_name = '{loadname}', location = '{location}')"}, slot=location)
+
+    def _load_once_statements(self, nickname: str, key: tuple, loads: Dict[str, str], slot: str = None) -> List[str]:
+        # loads maps each remote variable to the expression that creates it; if nickname was already loaded
+        # with the same key the variables keep their existing objects, anything else is loaded
+        statements = []
+        if slot is not None:
+            # a changed load may take the slot from this nickname's old labware or from what an earlier session left
+            # there (key[1] is the slot for labware and modules); anything else this session loaded still conflicts
+            statements += [
+                f"_evict = [n for n, k in _loaded.items() if k[1] == '{slot}' and (n == '{nickname}' or _loaded_by.get(n) != '{self._session_id}')]"
+                f" if _loaded.get('{nickname}') != {key!r} else []",
+                f"if _evict and protocol.deck['{slot}'] is not None: del protocol.deck['{slot}']",
+                "_loaded = {n: k for n, k in _loaded.items() if n not in _evict}",
+            ]
+        statements += [f"{name} = {name} if _loaded.get('{nickname}') == {key!r} else {expr}" for name, expr in loads.items()]
+        statements += [f"_loaded['{nickname}'] = {key!r}", f"_loaded_by['{nickname}'] = '{self._session_id}'"]
+        return statements
+
+    def _load_default_instrument(self, nickname:str, instrument_name:str, mount:str, tip_racks: List[str] = None):
+        # replace covers a mount that an earlier session on a reused protocol filled with another pipette
+        statements = self._load_once_statements(nickname, (instrument_name, mount), {
+            nickname: f"protocol.load_instrument(instrument_name = '{instrument_name}', mount = '{mount}', replace = True)"})
+        # set on every load, so a reused pipette picks up this session's racks; attached racks let transfer() fetch fresh tips
+        statements.insert(-2, f"{nickname}.tip_racks = [{', '.join(tip_racks or [])}]")
+        self.invoke_many(statements)
 
     def _load_custom_instrument(self, nickname: str, instrument_config: Dict, mount: str):
         raise NotImplementedError("custom instrument not implemented")
@@ -70,10 +267,23 @@ class OpentronsControl:
         #     "ot_default": True,
         #     "config": {}
         # }
-        if labware["ot_default"]:
-            self._load_default_labware(nickname=labware["nickname"], loadname=labware["loadname"], location=labware["location"])
-        else:
-            self._load_custom_labware(nickname=labware["nickname"], labware_config=labware["config"], location=labware["location"])
+        self.load_labware_batch([labware])
+
+    def load_labware_batch(self, labware_list: List[Dict]):
+        # same Dict format as load_labware; every item is loaded in a single round trip
+        statements = []
+        for labware in labware_list:
+            if labware["ot_default"]:
+                statements += self._default_labware_statements(nickname=labware["nickname"], loadname=labware["loadname"], location=labware["location"])
+            else:
+                statements += self._custom_labware_statements(nickname=labware["nickname"], labware_config=labware["config"], location=labware["location"])
+                self._sent_labware_defs[labware["config"]["parameters"]["loadName"]] = labware["config"]
+        try:
+            self.invoke_many(statements)
+        except BaseException:
+            # unknown how much of the block ran, so every definition is sent again next time
+            self._sent_labware_defs = {}
+            raise
 
     def load_instrument(self, instrument: Dict):
         # sample instrument Dict
@@ -82,10 +292,12 @@ class OpentronsControl:
         #     "instrument_name": "p1000_single_gen2",
         #     "mount": "right",
         #     "ot_default": True,
-        #     "config": {}
+        #     "config": {},
+        #     "tip_racks": ["tip_1000_96_1"]  # optional, nicknames of loaded tip racks
         # }
         if instrument["ot_default"]:
-            self._load_default_instrument(nickname=instrument["nickname"], instrument_name=instrument["instrument_name"], mount=instrument["mount"])
+            self._load_default_instrument(nickname=instrument["nickname"], instrument_name=instrument["instrument_name"], mount=instrument["mount"],
+                                          tip_racks=instrument.get("tip_racks"))
         else:
             self._load_custom_instrument(nickname=instrument["nickname"], instrument_config=instrument["config"], mount=instrument["mount"])
 
@@ -101,26 +313,38 @@ class OpentronsControl:
         module_name = module["module_name"]
         location = module["location"]
         adapter = module["adapter"]
-        self.invoke(f"{nickname} = protocol.load_module(module_name = '{module_name}', location = '{location}')")
-        self.invoke(f"{nickname}_adapter = {nickname}.load_adapter(name = '{adapter}')")
+        self.invoke_many(self._load_once_statements(nickname, (module_name, location, adapter), {
+            nickname: f"protocol.load_module(module_name = '{module_name}', location = '{location}')",
+            f"{nickname}_adapter": f"{nickname}.load_adapter(name = '{adapter}')",
+        }))
 
     def home(self):
         self.invoke("protocol.home()")
 
+    def _query(self, expr: str):
+        # the robot's REPL echoes the command and ends on a prompt, a local session answers with the bare repr,
+        # so the value is the last line that is neither; None when the expression produced nothing
+        output = self.invoke(expr)
+        lines = [line for line in output.splitlines() if line.strip() and not line.startswith(">>>") and line.strip() != expr]
+        return lines[-1] if lines else None
+
     def well_diameter(self, labware_nickname: str, position: str):
-        return float(self.invoke(f"{labware_nickname}['{position}'].diameter").split("\r\n")[-2])
+        return float(self._query(f"{labware_nickname}['{position}'].diameter"))
 
     def well_depth(self, labware_nickname: str, position: str):
-        return float(self.invoke(f"{labware_nickname}['{position}'].depth").split("\r\n")[-2])
+        return float(self._query(f"{labware_nickname}['{position}'].depth"))
 
     def tip_length(self, labware_nickname: str, position: str):
-        rtn = self.invoke(f"{labware_nickname}['{position}'].length").split("\r\n")
-        if len(rtn == 3):
-            return float(rtn[-2])
+        rtn = self._query(f"{labware_nickname}['{position}'].length")
+        if rtn is not None:
+            return float(rtn)
         else:
             return None
 
-    def get_location_from_labware(self, labware_nickname: str, position: str, top: float = 0, bottom: float=0, center: float=0):
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _location_expr(labware_nickname: str, position: str, top: float = 0, bottom: float=0, center: float=0):
+        # protocols revisit the same handful of wells, so each location string is only formatted once
         if top:
             append = f".top({top})"
         elif bottom:
@@ -129,7 +353,10 @@ class OpentronsControl:
             append = f".center()"
         else:
             append = ".top(0)" # original one with 0 offset at z axis
-        self.invoke(f"location = {labware_nickname}['{position}']{append}")
+        return f"{labware_nickname}['{position}']{append}"
+
+    def get_location_from_labware(self, labware_nickname: str, position: str, top: float = 0, bottom: float=0, center: float=0):
+        self.invoke(f"location = {self._location_expr(labware_nickname, position, top, bottom, center)}")
 
     def get_location_absolute(self, x: float, y: float, z: float, reference: str = None):
         # reference is deck position "1" "D1" etc. Default is None as deck itself
@@ -141,6 +368,14 @@ class OpentronsControl:
     def pick_up_tip(self, pip_name: str):
         self.invoke(f"{pip_name}.pick_up_tip(location = location)")
 
+    def pick_up_next_tip(self, pip_name: str):
+        # takes the next unused tip from the racks attached in load_instrument
+        self.invoke(f"{pip_name}.pick_up_tip()")
+
+    def set_starting_tip(self, pip_name: str, labware_nickname: str, position: str):
+        # where pick_up_next_tip starts walking the attached racks
+        self.invoke(f"{pip_name}.starting_tip = {labware_nickname}['{position}']")
+
     def return_tip(self, pip_name: str):
         self.invoke(f"{pip_name}.return_tip()")
 
@@ -150,23 +385,96 @@ class OpentronsControl:
     def prepare_aspirate(self, pip_name:str):
         self.invoke(f"{pip_name}.prepare_to_aspirate()")
 
-    def aspirate(self, pip_name: str, volume: float):
-        self.invoke(f"{pip_name}.aspirate(volume = {volume}, location = location)")
-
-    def dispense(self, pip_name: str, volume: float, push_out: float = None):
-        self.invoke(f"{pip_name}.dispense(volume = {volume}, location = location, push_out = {str(push_out)})")
+    def aspirate(self, pip_name: str, volume: float, location: Dict = None):
+        # location takes the same Dict as dispense_sequence and saves the separate lookup + move_to_pip round trips
+        location_expr = self._location_expr(**location) if location else "location"
+        self.invoke(f"{pip_name}.aspirate(volume = {volume}, location = {location_expr})")
+
+    def dispense(self, pip_name: str, volume: float, push_out: float = None, location: Dict = None):
+        location_expr = self._location_expr(**location) if location else "location"
+        self.invoke(f"{pip_name}.dispense(volume = {volume}, location = {location_expr}, push_out = {str(push_out)})")
+
+    def dispense_blowout(self, pip_name: str, volume: float, location: Dict, blowout_top: float = 0, push_out: float = None):
+        # dispense at location, then blow out over the same well at top(blowout_top), in one round trip
+        # InstrumentContext methods return the pipette, so the two calls chain into a single statement
+        location_expr = self._location_expr(**location)
+        blowout_expr = self._location_expr(location["labware_nickname"], location["position"], top=blowout_top)
+        self.invoke(f"{pip_name}.dispense(volume = {volume}, location = {location_expr}, push_out = {str(push_out)})"
+                    f".blow_out(location = {blowout_expr})")
+
+    def dispense_sequence(self, pip_name: str, volume: float, source: Dict, target: Union[Dict, List[Dict]],
+                          tip: Union[Dict, bool] = None, drop_tip: bool = False, push_out: float = None, blow_out: bool = True,
+                          blow_out_speed: float = None, travel_speed: float = None):
+        # sample location Dict, keys follow get_location_from_labware
+        # loc = {
+        #     "labware_nickname": "beaker",
+        #     "position": "A1",
+        #     "bottom": 5
+        # }
+        # The whole pick up / aspirate / dispense / blow out / drop cycle for one well costs one round trip
+        # A list of targets multi-dispenses `volume` into each from a single aspirate; blow out happens at the last one
+        # tip=True picks up the next tip from the attached racks instead of a given location
+        targets = target if isinstance(target, list) else [target]
+        source_loc = self._location_expr(**source)
+        target_locs = [self._location_expr(**t) for t in targets]
+        statements = []
+        if tip is True:
+            statements.append(f"{pip_name}.pick_up_tip()")
+        elif tip:
+            statements.append(f"{pip_name}.pick_up_tip(location = {self._location_expr(**tip)})")
+        statements.append(f"{pip_name}.aspirate(volume = {volume * len(targets)}, location = {source_loc})")
+        for target_loc in target_locs:
+            statements.append(f"{pip_name}.dispense(volume = {volume}, location = {target_loc}, push_out = {str(push_out)})")
+        if blow_out:
+            if blow_out_speed is not None:
+                statements.append(f"{pip_name}.default_speed = {blow_out_speed}")
+            statements.append(f"{pip_name}.blow_out(location = {target_locs[-1]})")
+            if travel_speed is not None:
+                statements.append(f"{pip_name}.default_speed = {travel_speed}")
+        if drop_tip:
+            statements.append(f"{pip_name}.drop_tip()")
+        self.invoke_many(statements)
+
+    def transfer(self, pip_name: str, volume: float, source: Union[Dict, List[Dict]], target: Union[Dict, List[Dict]],
+                 new_tip: str = "always", blow_out: bool = True, blowout_location: str = "destination well"):
+        # source / target use the same location Dict as dispense_sequence; a single source is paired with every target
+        # The robot plans the whole multi-well transfer itself, so it costs one round trip
+        # new_tip other than "never" needs tip_racks attached in load_instrument
+        sources = source if isinstance(source, list) else [source]
+        targets = target if isinstance(target, list) else [target]
+        source_locs = ", ".join(self._location_expr(**s) for s in sources)
+        target_locs = ", ".join(self._location_expr(**t) for t in targets)
+        blow_out_arg = f", blow_out = True, blowout_location = '{blowout_location}'" if blow_out else ""
+        self.invoke(f"{pip_name}.transfer({volume}, [{source_locs}], [{target_locs}], new_tip = '{new_tip}'{blow_out_arg})",
+                    timeout=_STEP_TIMEOUT * max(len(sources), len(targets)))
+
+    def distribute(self, pip_name: str, volume: float, source: Dict, target: List[Dict], new_tip: str = "once",
+                   disposal_volume: float = None):
+        # source / target use the same location Dict as dispense_sequence
+        # The robot aspirates for as many targets as fit in the tip, then dispenses into each without returning to source
+        # disposal_volume None keeps the API default (the pipette's minimum volume)
+        source_loc = self._location_expr(**source)
+        target_locs = ", ".join(self._location_expr(**t) for t in target)
+        disposal_arg = f", disposal_volume = {disposal_volume}" if disposal_volume is not None else ""
+        self.invoke(f"{pip_name}.distribute({volume}, {source_loc}, [{target_locs}], new_tip = '{new_tip}'{disposal_arg})",
+                    timeout=_STEP_TIMEOUT * len(target))
 
     def touch_tip(self, pip_name: str, labware_nickname: str, position: str, radius: float = 1.0, v_offset: float = -1.0):
         self.invoke(f"{pip_name}.touch_tip('{labware_nickname}['{position}']', radius = {radius}, v_offset = {v_offset})")
 
-    def blow_out(self, pip_name: str):
-        self.invoke(f"{pip_name}.blow_out(location = location)")
+    def blow_out(self, pip_name: str, location: Dict = None):
+        location_expr = self._location_expr(**location) if location else "location"
+        self.invoke(f"{pip_name}.blow_out(location = {location_expr})")
 
     def set_speed(self, pip_name: str, speed:float):
         self.invoke(f"{pip_name}.default_speed = {speed}")
 
-    def delay(self, seconds:float = 0, minutes: float = 0):
-        self.invoke(f"protocol.delay(seconds={seconds}, minutes = {minutes})")
+    def delay(self, seconds:float = 0, minutes: float = 0, block: bool = True):
+        # block=False returns a Future so local work (e.g. waiting on a sensor) overlaps the robot's wait
+        code = f"protocol.delay(seconds={seconds}, minutes = {minutes})"
+        if not block:
+            return self.invoke_async(code)
+        self.invoke(code)
 
     def resume(self):
         self.invoke("protocol.resume()")
@@ -196,12 +504,19 @@ class OpentronsControl:
         else:
             self.invoke(f"{nickname}.deactivate_shaker()")
 
-    def set_temp(self, nickname: str, temp: float):
+    def set_temp(self, nickname: str, temp: float, block: bool = True):
+        # block=False only sets the target, so pipetting continues while the module heats; call wait_for_temp before it matters
         if temp in range(27, 95):
-            self.invoke(f"{nickname}.set_and_wait_for_temperature(temp={temp})")
+            if block:
+                self.invoke(f"{nickname}.set_and_wait_for_temperature(temp={temp})")
+            else:
+                self.invoke(f"{nickname}.set_target_temperature(celsius={temp})")
         else:
             self.invoke(f"{nickname}.deactivate_heater()")
 
+    def wait_for_temp(self, nickname: str):
+        self.invoke(f"{nickname}.wait_for_temperature()")
+
     def get_rpm(self, nickname: str):
         return self.invoke(f"{nickname}.current_speed")
 
@@ -209,8 +524,12 @@ class OpentronsControl:
         return self.invoke(f"{nickname}.current_temperature")   
 
     def remove_labware(self, labware_nickname: str):
-        self.invoke(f"deck_pos = {labware_nickname}.parent")
-        self.invoke(f"del protocol.deck[deck_pos]")
+        self.invoke_many([
+            f"deck_pos = {labware_nickname}.parent",
+            "del protocol.deck[deck_pos]",
+            f"_loaded.pop('{labware_nickname}', None)",
+            f"_loaded_by.pop('{labware_nickname}', None)",
+        ])
 
     def home_pipette(self, pip_name: str):
         self.invoke(f"{pip_name}.home()")
@@ -221,3 +540,10 @@ class OpentronsControl:
     def close_session(self):
         self.home()
         self._disconnect()
+
+    def close_session_async(self) -> Future:
+        """Home and release the session without waiting, so a flow can return while the robot homes"""
+        # the single worker runs the home after anything already queued; the interpreter waits for it at exit
+        future = self._executor.submit(self.home)
+        self._executor.shutdown(wait=False)
+        return future
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 import threading
 import socket
+import select
 from contextlib import contextmanager
 from enum import Enum
 
@@ -17,6 +18,17 @@ class SessionState(Enum):
     PYTHON = "python"
     UNKNOWN = "unknown"
 
+class _FastCipherTransport(paramiko.Transport):
+    """Transport that offers AES-GCM and encrypt-then-MAC first so AES-NI/SHA-NI do the per-packet work"""
+    _preferred_ciphers = ('aes128-gcm@openssh.com', 'aes256-gcm@openssh.com') + tuple(
+        c for c in paramiko.Transport._preferred_ciphers
+        if c not in ('aes128-gcm@openssh.com', 'aes256-gcm@openssh.com')
+    )
+    _preferred_macs = ('hmac-sha2-256-etm@openssh.com',) + tuple(
+        m for m in paramiko.Transport._preferred_macs if m != 'hmac-sha2-256-etm@openssh.com'
+    )
+
+
 class SSHClient:
     """
     SSH Client for OT-2 with explicit session state management
@@ -28,7 +40,7 @@ class SSHClient:
     
     def __init__(self, hostname=None, username=None, key_file_path=None, 
                  host_alias=None, password=None, max_retries=3, 
-                 command_timeout=30, connection_timeout=10):
+                 command_timeout=30, connection_timeout=10, recovery_window=30):
         self.hostname = hostname
         self.username = username
         self.key_file_path = key_file_path
@@ -37,6 +49,9 @@ class SSHClient:
         self.max_retries = max_retries
         self.command_timeout = command_timeout
         self.connection_timeout = connection_timeout
+        # after every connect attempt fails, further connects fail fast until this window has passed
+        self.recovery_window = recovery_window
+        self._circuit_open_until = 0.0
         
         self.ssh_client = None
         self.session = None
@@ -69,6 +84,9 @@ class SSHClient:
     def connect(self) -> bool:
         """Establish SSH connection and start in shell mode"""
         with self._lock:
+            if time.monotonic() < self._circuit_open_until:
+                logger.warning(f"Skipping connect to {self.hostname}: it failed recently, retry after the recovery window")
+                return False
             for attempt in range(self.max_retries):
                 try:
                     if self.ssh_client:
@@ -86,8 +104,16 @@ class SSHClient:
                         username=self.username,
                         pkey=private_key,
                         timeout=self.connection_timeout,
-                        banner_timeout=self.connection_timeout
+                        banner_timeout=self.connection_timeout,
+                        disabled_algorithms={'ciphers': ['chacha20-poly1305@openssh.com']},
+                        auth_timeout=self.connection_timeout,
+                        transport_factory=_FastCipherTransport
                     )
+
+                    # Commands are many tiny writes, so don't let Nagle hold them back
+                    transport = self.ssh_client.get_transport()
+                    transport.set_keepalive(30)
+                    transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
                     
                     # Start shell session
                     self.session = self.ssh_client.invoke_shell()
@@ -99,6 +125,7 @@ class SSHClient:
                     
                     self.session_state = SessionState.SHELL
                     self.is_connected = True
+                    self._circuit_open_until = 0.0
                     logger.info(f"SSH connection established to {self.hostname} in SHELL mode")
                     return True
                     
@@ -109,6 +136,7 @@ class SSHClient:
                     else:
                         logger.error(f"Failed to connect after {self.max_retries} attempts")
                         self.is_connected = False
+                        self._circuit_open_until = time.monotonic() + self.recovery_window
                         return False
             
             return False
@@ -128,7 +156,7 @@ class SSHClient:
                 if "#" in chunk:
                     logger.info("Shell prompt detected")
                     return
-            time.sleep(0.1)
+            self._wait_for_data(0.1)
         
         logger.warning("Shell prompt not detected within timeout")
 
@@ -143,10 +171,19 @@ class SSHClient:
                 if ">>>" in chunk:
                     logger.info("Python prompt detected")
                     return
-            time.sleep(0.1)
+            self._wait_for_data(0.1)
         
         raise Exception("Python prompt not detected within timeout")
 
+    def _wait_for_data(self, timeout: float) -> bool:
+        """Block until the session has output to read, or until timeout"""
+        # Waiting on the channel wakes up as soon as the robot answers instead of
+        # paying a fixed polling sleep on every command
+        if self.session.recv_ready():
+            return True
+        readable, _, _ = select.select([self.session], [], [], timeout)
+        return bool(readable)
+
     def _clear_buffer(self):
         """Clear any pending output from the buffer"""
         try:
@@ -344,7 +381,7 @@ class SSHClient:
                         if continuation_mode and is_multiline and (current_time - last_chunk_time > 1.0):
                             self.session.send("\n")
                             continuation_mode = False
-                        time.sleep(0.1)
+                        self._wait_for_data(0.1)
                         
                 except socket.timeout:
                     raise socket.timeout(f"Python command timeout after {timeout} seconds")
@@ -386,7 +423,7 @@ class SSHClient:
                         if "# " in chunk:
                             break
                     else:
-                        time.sleep(0.1)
+                        self._wait_for_data(0.1)
                         
                 except socket.timeout:
                     raise socket.timeout(f"Shell command timeout after {timeout} seconds")
@@ -430,47 +430,53 @@ def print_deck_summary(protocol_context):
     """Print a nice summary of deck state."""
     deck = get_deck_state(protocol_context)
     
-    print("🗂️ Deck Summary")
-    print("=" * 40)
+    # lines are collected and printed at once, so the summary is a single write to stdout
+    parts = ["🗂️ Deck Summary", "=" * 40]
     
     for slot in range(1, 13):
         slot_str = str(slot)
         item = deck['slots'][slot_str]
         if item:
-            print(f"Slot {slot:2d}: {item['type'].title()} - {item['name']}")
+            parts.append(f"Slot {slot:2d}: {item['type'].title()} - {item['name']}")
         else:
-            print(f"Slot {slot:2d}: Empty")
+            parts.append(f"Slot {slot:2d}: Empty")
     
-    print(f"\n📊 Total: {deck['occupied_slots']}/12 slots occupied")
-    print(f"   Labwares: {len(deck['loaded_labwares'])}")
-    print(f"   Modules: {len(deck['loaded_modules'])}")
-    print(f"   Instruments: {len(deck['loaded_instruments'])}")
+    parts.append(f"\n📊 Total: {deck['occupied_slots']}/12 slots occupied")
+    parts.append(f"   Labwares: {len(deck['loaded_labwares'])}")
+    parts.append(f"   Modules: {len(deck['loaded_modules'])}")
+    parts.append(f"   Instruments: {len(deck['loaded_instruments'])}")
+    print("\n".join(parts))
 
 
 def print_labware_summary(labware_context):
     """Print a nice summary of labware state."""
     labware = get_labware_state(labware_context)
     
-    print(f"🧪 {labware['info']['name']} Summary")
-    print("=" * 40)
-    print(f"Type: {labware['info']['load_name']}")
-    print(f"Location: {labware['info']['parent']}")
-    print(f"Dimensions: {labware['dimensions']['rows']} x {labware['dimensions']['columns']} = {labware['dimensions']['total_wells']} wells")
+    parts = [
+        f"🧪 {labware['info']['name']} Summary",
+        "=" * 40,
+        f"Type: {labware['info']['load_name']}",
+        f"Location: {labware['info']['parent']}",
+        f"Dimensions: {labware['dimensions']['rows']} x {labware['dimensions']['columns']} = {labware['dimensions']['total_wells']} wells",
+    ]
     
     if labware['info']['is_tiprack']:
-        print(f"Tips available: {labware['summary']['available_tips']}/{labware['summary']['total_wells']}")
+        parts.append(f"Tips available: {labware['summary']['available_tips']}/{labware['summary']['total_wells']}")
     
     if labware['summary']['wells_with_liquid'] > 0:
-        print(f"Wells with liquid: {labware['summary']['wells_with_liquid']}")
+        parts.append(f"Wells with liquid: {labware['summary']['wells_with_liquid']}")
+    print("\n".join(parts))
 
 
 def print_pipette_summary(pipette_context):
     """Print a nice summary of pipette state."""
     pipette = get_pipette_state(pipette_context)
     
-    print(f"🔬 {pipette['name']} Summary")
-    print("=" * 40)
-    print(f"Mount: {pipette['mount']}")
-    print(f"Has tip: {pipette['has_tip']}")
-    print(f"Volume: {pipette['current_volume']}/{pipette['max_volume']} µL")
-    print(f"Tip racks: {len(pipette['tip_racks'])}") 
\ No newline at end of file
+    print("\n".join([
+        f"🔬 {pipette['name']} Summary",
+        "=" * 40,
+        f"Mount: {pipette['mount']}",
+        f"Has tip: {pipette['has_tip']}",
+        f"Volume: {pipette['current_volume']}/{pipette['max_volume']} µL",
+        f"Tip racks: {len(pipette['tip_racks'])}",
+    ])) 
\ No newline at end of file
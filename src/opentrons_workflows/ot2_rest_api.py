@@ -3,11 +3,14 @@ OT-2 REST API with Prefect Integration
 Provides HTTP endpoints for OT-2 robot control and workflow orchestration
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import orjson
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
 import asyncio
+import hashlib
 import logging
 import uuid
 from datetime import datetime
@@ -21,8 +24,10 @@ from prefect.server.schemas.states import StateType
 
 # Import our robust SSH client
 import sys
+from importlib.util import find_spec
 from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
+if find_spec("opentrons_workflows") is None:  # running from a checkout without pip install -e .
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 from opentrons_workflows.robust_ssh_client import RobustSSHClient
 
 # Configure logging
@@ -33,7 +38,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="OT-2 REST API",
     description="REST API for Opentrons OT-2 robot control with Prefect workflow integration",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware for web frontend integration
@@ -175,18 +181,24 @@ async def disconnect_robot(robot_id: str):
         raise HTTPException(status_code=500, detail=f"Disconnection error: {str(e)}")
 
 @app.get("/robots/{robot_id}/status")
-async def get_robot_status(robot_id: str):
-    """Get robot connection status"""
+async def get_robot_status(robot_id: str, request: Request):
+    """Get robot connection status, answering 304 when it matches the caller's If-None-Match"""
     try:
         client = robot_manager.get_connection(robot_id)
-        return {
+        body = orjson.dumps({
             "robot_id": robot_id,
             "status": client.get_connection_status(),
             "ping": client.ping()
-        }
+        }, option=orjson.OPT_SORT_KEYS)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Status check error: {str(e)}")
 
+    # pollers that send back the last ETag get an empty 304 while the status is unchanged
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 @app.get("/robots")
 async def list_robots():
     """List all connected robots"""
@@ -29,6 +29,10 @@ def my_protocol():
         pick_up_tip(p1000)
 ```
 
+`async def` functions are wrapped as async tasks, so they can be awaited or
+`.submit()`-ted from an async flow, e.g. with `await asyncio.wrap_future(ot.invoke_async(...))`
+inside the task body.
+
 ---
 Guidance on Retries
 ---
@@ -44,12 +48,22 @@ The `retries` parameter is powerful but should be used carefully.
 - These actions are *non-idempotent*. If a dispense task appears to fail but the
   liquid was actually dispensed, a retry would corrupt the experiment. These tasks
   should fail immediately to allow for manual inspection.
+
+---
+Batching
+---
+One task per pipetting step costs one robot round trip per step. `batch_commands`
+sends a short list of `OpentronsControl` calls as a single program instead, e.g.
+one aspirate / dispense / blow out cycle per task. Keep batches small (a handful of
+ops): a failed batch is one unit, so it should be easy to inspect by hand.
 """
 
 import functools
+import inspect
 from prefect import task, get_run_logger
+from prefect.tasks import exponential_backoff
 
-def robust_task(**task_kwargs):
+def robust_task(host_alias: str = None, enabled: bool = True, **task_kwargs):
     """
     A custom decorator factory for creating robust Prefect tasks for robot operations.
 
@@ -61,27 +75,72 @@ def robust_task(**task_kwargs):
     - Re-raising errors to allow Prefect to manage failure states and retries.
 
     Args:
+        host_alias (str, optional): Robot the task talks to. Adds the tag `robot-<host_alias>`,
+                       so a Prefect concurrency limit on that tag
+                       (`prefect concurrency-limit create robot-ot2 4`) caps in-flight
+                       commands to one robot across all flows and workers.
+        enabled (bool, optional): When False, the function is returned undecorated, so calls skip
+                       Prefect's task bookkeeping. Useful for cheap setup calls (labware / instrument
+                       loads) in simulation, e.g. `@robust_task(enabled=not SIMULATION)`. An already
+                       decorated task can also be called directly through its `.fn` attribute.
         **task_kwargs: Keyword arguments (e.g., `retries=2`, `name="my-task"`)
                        that are passed directly to the `prefect.task` decorator.
+                       With `retries` and no explicit `retry_delay_seconds`, retries
+                       back off exponentially with full jitter.
     """
+    if task_kwargs.get("retries"):
+        # jittered exponential delays keep flows that failed together from retrying together
+        task_kwargs.setdefault("retry_delay_seconds", exponential_backoff(backoff_factor=2))
+        task_kwargs.setdefault("retry_jitter_factor", 1.0)
+    if host_alias is not None:
+        task_kwargs["tags"] = [*task_kwargs.get("tags", []), f"robot-{host_alias}"]
+
     def decorator(func):
+        if not enabled:
+            return func
+        task_name = func.__name__
+
+        def log_failure(logger, e):
+            if isinstance(e, RuntimeError):
+                logger.error(f"Failure in {task_name}: Robot reported an error.")
+                # The full traceback from the robot is included in the exception message
+                logger.error(f"  Details: {e}")
+            else:
+                logger.error(f"Failure in {task_name}: An unexpected error occurred.", exc_info=True)
+
+        if inspect.iscoroutinefunction(func):
+            # async tasks let Prefect run its state bookkeeping while the robot works on the previous command
+            @task(**task_kwargs)
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                logger = get_run_logger()
+                logger.info(f"Executing: {task_name}...")
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    log_failure(logger, e)
+                    raise  # Re-raise for Prefect
+                logger.info(f"Success: {task_name} completed.")
+                return result
+            return async_wrapper
+
         @task(**task_kwargs)
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             logger = get_run_logger()
-            task_name = func.__name__
             logger.info(f"Executing: {task_name}...")
             try:
                 result = func(*args, **kwargs)
-                logger.info(f"Success: {task_name} completed.")
-                return result
-            except RuntimeError as e:
-                logger.error(f"Failure in {task_name}: Robot reported an error.")
-                # The full traceback from the robot is included in the exception message
-                logger.error(f"  Details: {e}")
-                raise  # Re-raise for Prefect
             except Exception as e:
-                logger.error(f"Failure in {task_name}: An unexpected error occurred.", exc_info=True)
-                raise
+                log_failure(logger, e)
+                raise  # Re-raise for Prefect
+            logger.info(f"Success: {task_name} completed.")
+            return result
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator 
+
+
+@robust_task()
+def batch_commands(ot, ops):
+    """Run several OpentronsControl calls, given as (method_name, args, kwargs), in one round trip."""
+    ot.exec_batch(ops)
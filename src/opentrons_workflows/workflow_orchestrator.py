@@ -15,8 +15,10 @@ import time
 
 # Import instrument clients
 import sys
+from importlib.util import find_spec
 from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
+if find_spec("opentrons_workflows") is None:  # running from a checkout without pip install -e .
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 from opentrons_workflows.robust_ssh_client import RobustSSHClient
 
 class InstrumentManager:
@@ -253,6 +255,49 @@ def collect_results(instrument_id: str, analysis_type: str):
     
     return results
 
+def _submit_sample_preparation(robot_id: str, samples: List[Dict], preparation_steps: List[Dict]) -> Dict:
+    """Submit one robot's preparation task chain; every task waits on the previous one (same pipettes/channel)"""
+    init_future = initialize_ot2_protocol.submit(robot_id)
+    labware_future = load_ot2_labware.submit(
+        robot_id, preparation_steps[0].get('labware', []), wait_for=[init_future]
+    )
+    instrument_future = load_ot2_instruments.submit(
+        robot_id, preparation_steps[0].get('instruments', []), wait_for=[labware_future]
+    )
+    prep_futures = []
+    previous = instrument_future
+    for step in preparation_steps:
+        if 'operations' in step:
+            previous = execute_ot2_liquid_handling.submit(robot_id, step['operations'], wait_for=[previous])
+            prep_futures.append(previous)
+    return {
+        "robot_id": robot_id,
+        "samples": samples,
+        "initialization": init_future,
+        "labware": labware_future,
+        "instruments": instrument_future,
+        "preparation_results": prep_futures
+    }
+
+def _collect_sample_preparation(run: Dict) -> Dict:
+    """Wait for a submitted preparation chain and build the sample_preparation_workflow result"""
+    return {
+        "workflow_type": "sample_preparation",
+        "robot_id": run["robot_id"],
+        "samples_processed": len(run["samples"]),
+        "initialization": run["initialization"].result(),
+        "labware": run["labware"].result(),
+        "instruments": run["instruments"].result(),
+        "preparation_results": [future.result() for future in run["preparation_results"]],
+        "completed_at": datetime.now().isoformat()
+    }
+
+def _preparation_finished(run: Dict) -> bool:
+    """True once a submitted chain has ended: its last task is final, or an earlier task failed and stalled the rest"""
+    futures = [run["initialization"], run["labware"], run["instruments"]] + run["preparation_results"]
+    states = [future.get_state() for future in futures]
+    return states[-1].is_final() or any(state.is_final() and not state.is_completed() for state in states)
+
 # High-Level Workflow Flows
 @flow
 def sample_preparation_workflow(
@@ -264,30 +309,8 @@ def sample_preparation_workflow(
     logger = get_run_logger()
     logger.info(f"Starting sample preparation workflow for {len(samples)} samples")
     
-    # Initialize robot
-    init_result = initialize_ot2_protocol(robot_id)
-    
-    # Load labware and instruments
-    labware_result = load_ot2_labware(robot_id, preparation_steps[0].get('labware', []))
-    instrument_result = load_ot2_instruments(robot_id, preparation_steps[0].get('instruments', []))
-    
-    # Execute preparation steps
-    prep_results = []
-    for step in preparation_steps:
-        if 'operations' in step:
-            result = execute_ot2_liquid_handling(robot_id, step['operations'])
-            prep_results.append(result)
-    
-    return {
-        "workflow_type": "sample_preparation",
-        "robot_id": robot_id,
-        "samples_processed": len(samples),
-        "initialization": init_result,
-        "labware": labware_result,
-        "instruments": instrument_result,
-        "preparation_results": prep_results,
-        "completed_at": datetime.now().isoformat()
-    }
+    # Same task chain the HTS workflow runs per robot, so the two paths can't drift apart
+    return _collect_sample_preparation(_submit_sample_preparation(robot_id, samples, preparation_steps))
 
 @flow
 def analytical_workflow(
@@ -343,31 +366,39 @@ def analytical_workflow(
 def high_throughput_screening_workflow(
     robot_ids: List[str],
     compound_library: List[Dict],
-    assay_parameters: Dict
+    assay_parameters: Dict,
+    max_concurrent_robots: int = 4
 ):
     """High-throughput screening workflow using multiple OT-2 robots"""
     logger = get_run_logger()
     logger.info(f"Starting HTS workflow with {len(robot_ids)} robots for {len(compound_library)} compounds")
+    if max_concurrent_robots < 1:
+        raise ValueError("max_concurrent_robots must be at least 1")
     
     # Divide compounds among available robots
     compounds_per_robot = len(compound_library) // len(robot_ids)
-    
-    screening_results = []
-    
-    for i, robot_id in enumerate(robot_ids):
-        start_idx = i * compounds_per_robot
-        end_idx = start_idx + compounds_per_robot if i < len(robot_ids) - 1 else len(compound_library)
-        
-        robot_compounds = compound_library[start_idx:end_idx]
-        
-        # Run screening on this robot
-        result = sample_preparation_workflow(
-            robot_id,
-            robot_compounds,
-            assay_parameters.get('preparation_steps', [])
-        )
+    preparation_steps = assay_parameters.get('preparation_steps', [])
+    
+    # Robots share no hardware, so their task chains run concurrently. At most max_concurrent_robots
+    # chains are in flight, and the next robot starts as soon as any one of them finishes
+    screening_results = [None] * len(robot_ids)
+    in_flight = {}
+    next_robot = 0
+    while next_robot < len(robot_ids) or in_flight:
+        while next_robot < len(robot_ids) and len(in_flight) < max_concurrent_robots:
+            i = next_robot
+            start_idx = i * compounds_per_robot
+            end_idx = start_idx + compounds_per_robot if i < len(robot_ids) - 1 else len(compound_library)
+            
+            robot_compounds = compound_library[start_idx:end_idx]
+            in_flight[i] = _submit_sample_preparation(robot_ids[i], robot_compounds, preparation_steps)
+            next_robot += 1
         
-        screening_results.append(result)
+        finished = [i for i, run in in_flight.items() if _preparation_finished(run)]
+        if not finished:
+            time.sleep(0.5)
+        for i in finished:
+            screening_results[i] = _collect_sample_preparation(in_flight.pop(i))
     
     return {
         "workflow_type": "high_throughput_screening",
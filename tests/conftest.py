@@ -5,12 +5,22 @@ pytest configuration file with fixtures for opentrons_workflows testing.
 import pytest
 import sys
 from pathlib import Path
-from unittest.mock import Mock, MagicMock
+from types import ModuleType, SimpleNamespace
+from unittest.mock import Mock, MagicMock, patch
 
 # Add src to path for development
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from opentrons_workflows.opentrons_sshclient import SSHClient, SessionState
+from opentrons_workflows import opentrons_control
+
+
+@pytest.fixture(autouse=True)
+def clear_sshclient_pool():
+    """Keep pooled SSH clients (real or mocked) from leaking between tests"""
+    opentrons_control._pooled_clients.clear()
+    yield
+    opentrons_control._pooled_clients.clear()
 
 
 @pytest.fixture
@@ -48,6 +58,70 @@ def mock_ssh_client():
     return client
 
 
+@pytest.fixture
+def robot(mock_ssh_client):
+    """OpentronsControl in simulation mode on mock_ssh_client, with the protocol setup call already cleared"""
+    with patch('opentrons_workflows.opentrons_control.SSHClient', return_value=mock_ssh_client):
+        ot = opentrons_control.OpentronsControl(host_alias="test", simulation=True)
+        mock_ssh_client.execute_python_command.reset_mock()
+        yield ot
+
+
+class _Deck(dict):
+    def __missing__(self, slot):
+        return None
+
+
+class FakeProtocol:
+    """Just enough of opentrons' ProtocolContext to refuse loads into an occupied slot or mount, as the real one does"""
+
+    def __init__(self):
+        self.deck = _Deck()
+        self.instruments = {}
+
+    def _place(self, location, item):
+        if self.deck[location] is not None:
+            raise RuntimeError(f"Slot {location} is already occupied")
+        self.deck[location] = item
+        return item
+
+    def load_labware(self, load_name, location):
+        return self._place(location, SimpleNamespace(load_name=load_name))
+
+    def load_labware_from_definition(self, labware_def, location):
+        return self._place(location, SimpleNamespace(load_name=labware_def["parameters"]["loadName"]))
+
+    def load_module(self, module_name, location):
+        return self._place(location, SimpleNamespace(module_name=module_name, load_adapter=lambda name: SimpleNamespace(load_name=name)))
+
+    def load_instrument(self, instrument_name, mount, tip_racks=None, replace=False):
+        if mount in self.instruments and not replace:
+            raise RuntimeError(f"Instrument already present on {mount} mount")
+        self.instruments[mount] = SimpleNamespace(name=instrument_name, tip_racks=tip_racks or [])
+        return self.instruments[mount]
+
+    def home(self):
+        pass
+
+
+@pytest.fixture
+def local_session(monkeypatch):
+    """One _LocalSession shared by every local OpentronsControl, like a pooled SSH client, on stand-in opentrons modules"""
+    # opentrons itself is not a test dependency
+    opentrons = ModuleType("opentrons")
+    opentrons.protocol_api = ModuleType("opentrons.protocol_api")
+    opentrons.simulate = ModuleType("opentrons.simulate")
+    opentrons.simulate.get_protocol_api = lambda version: FakeProtocol()
+    opentrons.types = ModuleType("opentrons.types")
+    opentrons.types.Point = opentrons.types.Location = object
+    for name in ("opentrons", "opentrons.protocol_api", "opentrons.simulate", "opentrons.types"):
+        monkeypatch.setitem(sys.modules, name, getattr(opentrons, name.split(".")[-1], opentrons))
+
+    session = opentrons_control._LocalSession()
+    monkeypatch.setattr(opentrons_control, "_LocalSession", lambda: session)
+    return session
+
+
 @pytest.fixture
 def client(mock_ssh_client):
     """Alias for mock_ssh_client to match existing test expectations"""
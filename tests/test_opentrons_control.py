@@ -127,7 +127,458 @@ def test_opentrons_control_basic_methods():
         mock_client.execute_python_command.assert_called()
 
 
-@pytest.mark.integration  
+def test_opentrons_control_invoke_many_single_round_trip(mock_ssh_client):
+    """Test that invoke_many sends all statements in one executable command"""
+    
+    with patch('opentrons_workflows.opentrons_control.SSHClient', return_value=mock_ssh_client):
+        robot = OpentronsControl(host_alias="test", simulation=True)
+    
+    # Protocol setup should only cost a single command
+    assert mock_ssh_client.execute_python_command.call_count == 1
+    
+    mock_ssh_client.execute_python_command.reset_mock()
+    robot.invoke_many(["a = 1", "b = a + 1"])
+    
+    assert mock_ssh_client.execute_python_command.call_count == 1
+    command = mock_ssh_client.execute_python_command.call_args[0][0]
+    assert "\n" not in command
+    
+    # The remote command must run both statements in order
+    namespace = {}
+    exec(command, namespace)
+    assert namespace["b"] == 2
+
+
+def test_opentrons_control_dispense_sequence(robot, mock_ssh_client):
+    """Test that a full per-well pipetting cycle is sent as one command"""
+
+    robot.dispense_sequence(
+        pip_name="p20", volume=10,
+        tip={"labware_nickname": "tips", "position": "A1", "top": 0},
+        source={"labware_nickname": "vials", "position": "B2", "bottom": 5},
+        target={"labware_nickname": "plate", "position": "C3", "top": -1},
+        drop_tip=True,
+    )
+    
+    assert mock_ssh_client.execute_python_command.call_count == 1
+    command = mock_ssh_client.execute_python_command.call_args[0][0]
+    assert "p20.pick_up_tip(location = tips['A1'].top(0))" in command
+    assert "p20.aspirate(volume = 10, location = vials['B2'].bottom(5))" in command
+    assert "p20.blow_out(location = plate['C3'].top(-1))" in command
+    assert "p20.drop_tip()" in command
+
+
+def test_opentrons_control_dispense_sequence_multi_target(robot, mock_ssh_client):
+    """Test that a list of targets is served by one aspirate and blown out at the last well"""
+
+    robot.dispense_sequence(
+        pip_name="p300", volume=150,
+        source={"labware_nickname": "beaker", "position": "A1", "bottom": 5},
+        target=[
+            {"labware_nickname": "plate", "position": "A1", "top": -1},
+            {"labware_nickname": "plate", "position": "A2", "top": -1},
+        ],
+    )
+
+    assert mock_ssh_client.execute_python_command.call_count == 1
+    command = mock_ssh_client.execute_python_command.call_args[0][0]
+    assert command.count(".aspirate(") == 1
+    assert "p300.aspirate(volume = 300, location = beaker['A1'].bottom(5))" in command
+    assert "p300.dispense(volume = 150, location = plate['A1'].top(-1), push_out = None)" in command
+    assert "p300.dispense(volume = 150, location = plate['A2'].top(-1), push_out = None)" in command
+    assert "p300.blow_out(location = plate['A2'].top(-1))" in command
+
+
+def test_opentrons_control_transfer(robot, mock_ssh_client):
+    """Test that a multi-well transfer is sent as a single transfer() call"""
+
+    robot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left",
+                           "ot_default": True, "tip_racks": ["tips_1", "tips_2"]})
+    assert "tip_racks = [tips_1, tips_2]" in mock_ssh_client.execute_python_command.call_args[0][0]
+    mock_ssh_client.execute_python_command.reset_mock()
+
+    robot.transfer(
+        pip_name="p20", volume=15,
+        source=[{"labware_nickname": "plate", "position": "A1", "bottom": 1},
+                {"labware_nickname": "plate", "position": "A2", "bottom": 1}],
+        target=[{"labware_nickname": "plate", "position": "E1", "bottom": 3},
+                {"labware_nickname": "plate", "position": "E2", "bottom": 3}],
+    )
+
+    mock_ssh_client.execute_python_command.assert_called_once_with(
+        "p20.transfer(15, [plate['A1'].bottom(1), plate['A2'].bottom(1)], [plate['E1'].bottom(3), plate['E2'].bottom(3)], "
+        "new_tip = 'always', blow_out = True, blowout_location = 'destination well')",
+        60,
+    )
+
+
+def test_opentrons_control_distribute(robot, mock_ssh_client):
+    """Test that a one-source, many-target distribute is sent as a single command"""
+
+    robot.distribute(pip_name="p300", volume=50,
+                     source={"labware_nickname": "beaker", "position": "A1", "bottom": 5},
+                     target=[{"labware_nickname": "plate", "position": w, "top": -1} for w in ("A1", "A2")],
+                     disposal_volume=0)
+    mock_ssh_client.execute_python_command.assert_called_once_with(
+        "p300.distribute(50, beaker['A1'].bottom(5), [plate['A1'].top(-1), plate['A2'].top(-1)], "
+        "new_tip = 'once', disposal_volume = 0)", 60)
+
+
+def test_opentrons_control_rebinds_repeated_location(robot, mock_ssh_client):
+    """Test that the same location is re-sent, since the remote `location` is shared with other sessions on the REPL"""
+
+    robot.get_location_from_labware(labware_nickname="vial", position="A1", bottom=10)
+    robot.invoke("location = plate['A1'].top(0)")
+    robot.get_location_from_labware(labware_nickname="vial", position="A1", bottom=10)
+    assert [c[0][0] for c in mock_ssh_client.execute_python_command.call_args_list] == [
+        "location = vial['A1'].bottom(10)",
+        "location = plate['A1'].top(0)",
+        "location = vial['A1'].bottom(10)",
+    ]
+
+
+def test_opentrons_control_next_tip_from_rack(robot, mock_ssh_client):
+    """Test that tip=True and pick_up_next_tip let the pipette walk its attached racks"""
+
+    robot.set_starting_tip(pip_name="p20", labware_nickname="tips", position="A5")
+    robot.pick_up_next_tip(pip_name="p20")
+    assert [c[0][0] for c in mock_ssh_client.execute_python_command.call_args_list] == [
+        "p20.starting_tip = tips['A5']",
+        "p20.pick_up_tip()",
+    ]
+
+    mock_ssh_client.execute_python_command.reset_mock()
+    robot.dispense_sequence(
+        pip_name="p20", volume=10, tip=True,
+        source={"labware_nickname": "vial", "position": "A1", "bottom": 10},
+        target={"labware_nickname": "plate", "position": "A1", "top": 1},
+    )
+    command = mock_ssh_client.execute_python_command.call_args[0][0]
+    assert "p20.pick_up_tip()" in command
+
+
+def test_opentrons_control_non_blocking_set_temp(robot, mock_ssh_client):
+    """Test that set_temp(block=False) only sets the target and wait_for_temp waits for it"""
+
+    robot.set_temp(nickname="hs", temp=37, block=False)
+    robot.wait_for_temp(nickname="hs")
+    assert [c[0][0] for c in mock_ssh_client.execute_python_command.call_args_list] == [
+        "hs.set_target_temperature(celsius=37)",
+        "hs.wait_for_temperature()",
+    ]
+
+
+def test_opentrons_control_aspirate_dispense_with_location(robot, mock_ssh_client):
+    """Test that aspirate/dispense accept a location and fold it into the same command"""
+
+    robot.aspirate(pip_name="p300", volume=200, location={"labware_nickname": "vial", "position": "A1", "bottom": 10})
+    robot.dispense(pip_name="p300", volume=200, location={"labware_nickname": "plate", "position": "A1", "top": -1})
+    robot.dispense(pip_name="p300", volume=50)
+    assert [c[0][0] for c in mock_ssh_client.execute_python_command.call_args_list] == [
+        "p300.aspirate(volume = 200, location = vial['A1'].bottom(10))",
+        "p300.dispense(volume = 200, location = plate['A1'].top(-1), push_out = None)",
+        "p300.dispense(volume = 50, location = location, push_out = None)",
+    ]
+
+
+def test_opentrons_control_dispense_blowout(robot, mock_ssh_client):
+    """Test that a dispense and the blow out over the same well go out as one chained command"""
+
+    robot.dispense_blowout(pip_name="p300", volume=150, location={"labware_nickname": "plate", "position": "B3", "top": -1})
+    mock_ssh_client.execute_python_command.assert_called_once_with(
+        "p300.dispense(volume = 150, location = plate['B3'].top(-1), push_out = None)"
+        ".blow_out(location = plate['B3'].top(0))", None)
+
+
+def test_opentrons_control_batch(robot, mock_ssh_client):
+    """Test that commands inside batch() reach the robot as one program"""
+
+    with robot.batch():
+        robot.get_location_from_labware(labware_nickname="tips", position="A1", top=0)
+        robot.pick_up_tip(pip_name="p20")
+        robot.dispense_sequence(
+            pip_name="p20", volume=10,
+            source={"labware_nickname": "vial", "position": "A1", "bottom": 10},
+            target={"labware_nickname": "plate", "position": "A1", "top": 1},
+            drop_tip=True,
+        )
+        assert mock_ssh_client.execute_python_command.call_count == 0
+
+    assert mock_ssh_client.execute_python_command.call_count == 1
+    command = mock_ssh_client.execute_python_command.call_args[0][0]
+    assert command.startswith("exec(")
+    assert mock_ssh_client.execute_python_command.call_args[0][1] == 30 * 6
+    assert "location = tips['A1'].top(0)" in command
+    assert "p20.drop_tip()" in command
+
+    mock_ssh_client.execute_python_command.reset_mock()
+    with pytest.raises(RuntimeError):
+        with robot.batch():
+            robot.home()
+            raise RuntimeError("abort")
+    assert mock_ssh_client.execute_python_command.call_count == 0
+
+
+def test_opentrons_control_batch_leaves_background_commands_alone(robot, mock_ssh_client):
+    """Test that a background command running while a batch is open is sent, not buffered into the batch"""
+    import threading
+
+    gate = threading.Event()
+    robot._executor.submit(gate.wait)
+    future = robot.delay(seconds=5, block=False)
+    with robot.batch():
+        robot.home()
+        # the worker only reaches the delay once the batch is open
+        gate.set()
+        assert future.result(timeout=5) == ">>> mock_output\n>>> "
+    assert [c[0][0] for c in mock_ssh_client.execute_python_command.call_args_list] == [
+        "protocol.delay(seconds=5, minutes = 0)",
+        "protocol.home()",
+    ]
+
+
+def test_local_session_behaves_like_repl():
+    """Test that the in-process session answers expressions and keeps state between commands"""
+    from opentrons_workflows.opentrons_control import _LocalSession
+
+    session = _LocalSession()
+    assert session.execute_python_command("x = 20") == ""
+    assert session.execute_python_command("exec('y = x\\nz = y + 1')") == ""
+    assert session.execute_python_command("z") == "21"
+    with pytest.raises(Exception, match="Python error in command execution"):
+        session.execute_python_command("undefined_name")
+
+
+def test_opentrons_control_local_requires_simulation():
+    """Test that a local session refuses to drive real hardware"""
+
+    with pytest.raises(ValueError):
+        OpentronsControl(simulation=False, local=True)
+
+
+def test_opentrons_control_reads_values_over_ssh(robot, mock_ssh_client):
+    """Test that read-backs parse the value out of the REPL's echo and prompt"""
+
+    mock_ssh_client.execute_python_command.return_value = "plate['A1'].depth\r\n10.67\r\n>>> "
+    assert robot.well_depth(labware_nickname="plate", position="A1") == 10.67
+    mock_ssh_client.execute_python_command.return_value = "tips['A1'].length\r\n>>> "
+    assert robot.tip_length(labware_nickname="tips", position="A1") is None
+
+
+def test_opentrons_control_reads_values_locally(local_session):
+    """Test that read-backs work on a local session, which answers with a bare repr"""
+    from types import SimpleNamespace
+
+    ot = OpentronsControl(simulation=True, local=True)
+    local_session.namespace["plate"] = {"A1": SimpleNamespace(diameter=6.4, depth=10.67, length=None)}
+    assert ot.well_diameter(labware_nickname="plate", position="A1") == 6.4
+    assert ot.well_depth(labware_nickname="plate", position="A1") == 10.67
+    assert ot.tip_length(labware_nickname="plate", position="A1") is None
+
+
+def test_opentrons_control_reuses_loads_across_sessions(local_session):
+    """Test that a second session on the same REPL keeps the protocol and what the first session loaded"""
+
+    loaded = []
+    for _ in range(2):
+        ot = OpentronsControl(simulation=True, local=True)
+        ot.load_labware({"nickname": "tips", "loadname": "opentrons_96_tiprack_20ul", "location": "7", "ot_default": True})
+        ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left",
+                            "ot_default": True, "tip_racks": ["tips"]})
+        ot.load_module({"nickname": "temp", "module_name": "temperature module gen2", "location": "3",
+                        "adapter": "opentrons_96_well_aluminum_block"})
+        loaded.append({name: local_session.namespace[name] for name in ("protocol", "tips", "p20", "temp", "temp_adapter")})
+
+    assert loaded[0] == loaded[1]
+    protocol = local_session.namespace["protocol"]
+    assert protocol.instruments == {"left": loaded[1]["p20"]}
+    assert loaded[1]["p20"].tip_racks == [loaded[1]["tips"]]
+
+
+def test_opentrons_control_slot_conflict_within_session(local_session):
+    """Test that two nicknames loaded into one slot by the same session still conflict, while a later session may take the slot"""
+
+    plate_a = {"nickname": "plate_a", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True}
+    plate_b = {"nickname": "plate_b", "loadname": "nest_96_wellplate_200ul_flat", "location": "1", "ot_default": True}
+    namespace = local_session.namespace
+
+    ot = OpentronsControl(simulation=True, local=True)
+    ot.load_labware(plate_a)
+    with pytest.raises(Exception, match="Slot 1 is already occupied"):
+        ot.load_labware(plate_b)
+    assert namespace["protocol"].deck["1"] is namespace["plate_a"]
+
+    OpentronsControl(simulation=True, local=True).load_labware(plate_b)
+    assert namespace["protocol"].deck["1"] is namespace["plate_b"]
+    assert "plate_a" not in namespace["_loaded"]
+
+
+def test_opentrons_control_chained_flows_share_session(local_session):
+    """Test that the demo/snar_test deck setups run flow after flow on one OpentronsControl"""
+
+    def setup(ot, tip_def, extra_plates=(), p20_racks=(), p300_racks=()):
+        # mirrors the batch at the top of each snar_test flow
+        plates = [{"nickname": "plate_96_1", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True}]
+        plates += [{"nickname": nickname, "loadname": "corning_96_wellplate_360ul_flat", "location": slot, "ot_default": True}
+                   for nickname, slot in extra_plates]
+        tips = [
+            {"nickname": "tip_20_96_1", "config": {"parameters": {"loadName": tip_def}}, "location": "7", "ot_default": False},
+            {"nickname": "tip_300_96_1", "loadname": "opentrons_96_tiprack_300ul", "location": "8", "ot_default": True},
+        ]
+        with ot.batch():
+            ot.load_labware_batch(plates + tips)
+            ot.load_instrument({"nickname": "p20", "instrument_name": "p20_single_gen2", "mount": "left",
+                                "ot_default": True, "tip_racks": list(p20_racks)})
+            ot.load_instrument({"nickname": "p300", "instrument_name": "p300_single_gen2", "mount": "right",
+                                "ot_default": True, "tip_racks": list(p300_racks)})
+
+    ot = OpentronsControl(simulation=True, local=True)
+    setup(ot, "matterlab_96_tiprack_10ul", p20_racks=["tip_20_96_1"])
+    setup(ot, "matterlab_96_tiprack_10ul", extra_plates=[("plate_96_2", "4")], p300_racks=["tip_300_96_1"])
+    setup(ot, "matterlab_96_tiprack_20ul", p20_racks=["tip_20_96_1"])
+
+    namespace = local_session.namespace
+    deck = namespace["protocol"].deck
+    assert deck["7"] is namespace["tip_20_96_1"]
+    assert deck["7"].load_name == "matterlab_96_tiprack_20ul"
+    assert deck["4"] is namespace["plate_96_2"]
+    assert namespace["p20"].tip_racks == [deck["7"]]
+    assert namespace["p300"].tip_racks == []
+
+
+def test_opentrons_control_exec_batch(robot, mock_ssh_client):
+    """Test that a list of (method, args, kwargs) ops is sent as a single program"""
+
+    robot.exec_batch([
+        ("aspirate", ("p300", 150), {"location": {"labware_nickname": "beaker", "position": "A1", "bottom": 5}}),
+        ("dispense", ("p300", 150), {"location": {"labware_nickname": "plate", "position": "A1", "top": -1}}),
+        ("blow_out", ("p300",), {"location": {"labware_nickname": "plate", "position": "A1", "top": -1}}),
+    ])
+
+    assert mock_ssh_client.execute_python_command.call_count == 1
+    command = mock_ssh_client.execute_python_command.call_args[0][0]
+    assert "p300.aspirate(volume = 150, location = beaker['A1'].bottom(5))" in command
+    assert "p300.blow_out(location = plate['A1'].top(-1))" in command
+
+
+def test_opentrons_control_non_blocking_delay(robot, mock_ssh_client):
+    """Test that delay(block=False) returns a future for the remote wait"""
+    
+    future = robot.delay(seconds=5, block=False)
+    assert future.result(timeout=5) == ">>> mock_output\n>>> "
+    
+    calls = mock_ssh_client.execute_python_command.call_args_list
+    call_commands = [call[0][0] for call in calls]
+    assert "protocol.delay(seconds=5, minutes = 0)" in call_commands
+
+
+def test_opentrons_control_load_labware_batch(robot, mock_ssh_client):
+    """Test that several labware definitions are loaded with a single command"""
+
+    robot.load_labware_batch([
+        {"nickname": "plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True},
+        {"nickname": "beaker", "location": "4", "ot_default": False,
+         "config": {"parameters": {"loadName": "matterlab_1_beaker_30000ul"}}},
+    ])
+
+    assert mock_ssh_client.execute_python_command.call_count == 1
+    command = mock_ssh_client.execute_python_command.call_args[0][0]
+    assert "else protocol.load_labware(load_name = 'corning_96_wellplate_360ul_flat', location = '1')" in command
+    assert "else protocol.load_labware_from_definition(labware_def = matterlab_1_beaker_30000ul, location = '4')" in command
+
+
+def test_opentrons_control_labware_loaded_once_per_protocol(mock_ssh_client):
+    """Test that labware already loaded into a reused protocol keeps its object instead of reloading"""
+
+    with patch('opentrons_workflows.opentrons_control.SSHClient', return_value=mock_ssh_client):
+        robot = OpentronsControl(host_alias="test", simulation=True)
+    assert "_loaded = _loaded if globals().get('_protocol_mode') == 'simulate' else {}" in \
+        mock_ssh_client.execute_python_command.call_args[0][0]
+    mock_ssh_client.execute_python_command.reset_mock()
+
+    robot.load_labware({"nickname": "plate", "loadname": "corning_96_wellplate_360ul_flat", "location": "1", "ot_default": True})
+    command = mock_ssh_client.execute_python_command.call_args[0][0]
+    assert "plate = plate if _loaded.get('plate') == ('corning_96_wellplate_360ul_flat', '1') else " in command
+    assert "_loaded['plate'] = ('corning_96_wellplate_360ul_flat', '1')" in command
+
+
+def test_opentrons_control_custom_labware_def_sent_once(robot, mock_ssh_client):
+    """Test that a custom labware definition is sent once and later loads refer to it by loadName"""
+
+    vial_def = {"parameters": {"loadName": "vial_plate"}, "wells": {"A1": {"depth": 40}}}
+    robot.load_labware_batch([
+        {"nickname": "vial_1", "config": vial_def, "location": "5", "ot_default": False},
+        {"nickname": "vial_2", "config": vial_def, "location": "6", "ot_default": False},
+    ])
+    robot.load_labware({"nickname": "vial_3", "config": vial_def, "location": "7", "ot_default": False})
+    commands = [c[0][0] for c in mock_ssh_client.execute_python_command.call_args_list]
+    assert commands[0].count("vial_plate={") == 1
+    assert "vial_plate={" not in commands[1]
+    assert "load_labware_from_definition(labware_def = vial_plate, location = '7')" in commands[1]
+
+    # an aborted batch sends nothing, so the definition has to go out again
+    with pytest.raises(ValueError):
+        with robot.batch():
+            robot.load_labware({"nickname": "vial_4", "config": {**vial_def, "version": 2}, "location": "8", "ot_default": False})
+            raise ValueError("abort")
+    robot.load_labware({"nickname": "vial_4", "config": vial_def, "location": "8", "ot_default": False})
+    assert "vial_plate={" in mock_ssh_client.execute_python_command.call_args[0][0]
+
+
+def test_opentrons_control_close_session_async(robot, mock_ssh_client):
+    """Test that close_session_async homes in the background and stops accepting async work"""
+
+    robot.close_session_async().result()
+    mock_ssh_client.execute_python_command.assert_called_once_with("protocol.home()", None)
+    with pytest.raises(RuntimeError):
+        robot.invoke_async("protocol.home()")
+
+
+def test_opentrons_control_reuses_pooled_client(mock_ssh_client):
+    """Test that sessions to the same robot share one SSH connection"""
+
+    with patch('opentrons_workflows.opentrons_control.SSHClient', return_value=mock_ssh_client) as mock_ssh_class:
+        first = OpentronsControl(host_alias="test", simulation=True)
+        first.close_session()
+        second = OpentronsControl(host_alias="test", simulation=True)
+
+        assert second.client is first.client
+        mock_ssh_class.assert_called_once()
+        mock_ssh_client.connect.assert_called_once()
+        mock_ssh_client.close.assert_not_called()
+
+
+def test_sshclient_pool_drops_failed_connect():
+    """Test that a client whose connect failed is not handed to the next session"""
+    from opentrons_workflows.opentrons_control import _get_sshclient, _pooled_clients
+
+    with patch('opentrons_workflows.opentrons_control.SSHClient') as mock_ssh_class:
+        mock_ssh_class.return_value.connect.return_value = False
+        _get_sshclient("robot", "root", "key", "ot2", "")
+        assert not _pooled_clients
+
+        mock_ssh_class.return_value.connect.return_value = True
+        client = _get_sshclient("robot", "root", "key", "ot2", "")
+        assert mock_ssh_class.call_count == 2
+        assert list(_pooled_clients.values()) == [client]
+
+
+def test_sshclient_pool_closes_evicted_clients():
+    """Test that the least recently used client is closed once more robots than the pool holds are in use"""
+    from opentrons_workflows.opentrons_control import _get_sshclient, _MAX_POOLED_CLIENTS
+
+    with patch('opentrons_workflows.opentrons_control.SSHClient', side_effect=lambda **kwargs: Mock()):
+        clients = [_get_sshclient(f"robot{i}", "root", "key", f"ot2_{i}", "") for i in range(_MAX_POOLED_CLIENTS)]
+        # touching the first robot again makes the second the least recently used
+        assert _get_sshclient("robot0", "root", "key", "ot2_0", "") is clients[0]
+        _get_sshclient("robot_new", "root", "key", "ot2_new", "")
+
+    clients[1].close.assert_called_once()
+    for client in clients[:1] + clients[2:]:
+        client.close.assert_not_called()
+
+
+@pytest.mark.integration
 def test_opentrons_control_simulation_mode():
     """Test OpentronsControl in simulation mode"""
     
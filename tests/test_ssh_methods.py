@@ -15,6 +15,7 @@ With various timeout configurations and error handling patterns.
 import sys
 import time
 from pathlib import Path
+from unittest.mock import patch
 
 # Add src to path for development
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -162,6 +163,22 @@ def test_protocol_state_tracking():
     return states_code, protocol_commands
 
 
+def test_ssh_client_fails_fast_after_failed_connect():
+    """Test that a robot that just failed every connect attempt is not retried until the window passes"""
+
+    client = SSHClient(hostname="robot", username="root", key_file_path="missing_key", max_retries=1)
+    with patch('opentrons_workflows.opentrons_sshclient.paramiko.SSHClient') as mock_paramiko:
+        mock_paramiko.return_value.connect.side_effect = OSError("unreachable")
+        with patch('opentrons_workflows.opentrons_sshclient.paramiko.RSAKey.from_private_key_file'):
+            assert client.connect() is False
+            assert client.connect() is False
+            assert mock_paramiko.return_value.connect.call_count == 1
+
+            client._circuit_open_until = 0.0
+            assert client.connect() is False
+            assert mock_paramiko.return_value.connect.call_count == 2
+
+
 def main():
     """Run comprehensive SSH client method tests"""
     print("🧪 Comprehensive SSH Client Methods Test")